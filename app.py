@@ -1,29 +1,65 @@
+import json
 import os
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from datetime import timedelta, timezone
-
-import pytz
-import requests
-from babel.dates import format_datetime
-from flask import Flask
-from flask import request, jsonify
+from functools import partial
+
+from flask import Flask, Response
+from flask import request, jsonify, g
+
+import calendly_webhook
+import http_client
+import locales
+import metrics
+import whatsapp
+from availability import AvailabilitySnapshot
+from circuit_breaker import CLOSED
+from dedup import MessageDeduplicator
+from flow import ANY, Flow, Transition
+from outbox import BookingOutbox
+from refresher import AvailabilityRefresher
+from reservations import ReservationLedger
+from session_store import make_session_store
+from singleflight import SingleFlight
+from slot_decoder import decode_times, format_minute, local_timezone, parse_minute
+from tenants import load_registry
+from whatsapp import (
+    send_confirmation, send_date_slots, send_main_menu, send_service_list, send_time_slots,
+    send_whatsapp_message,
+)
+from work_queue import MessageQueue
 
 app = Flask(__name__)
-data_store = {}
+data_store = make_session_store()
+
+metrics.Gauge("session_store_size", "Conversation sessions held in data_store.", callback=lambda: len(data_store))
 
 # --- Settings ---
-# SESSION_TIMEOUT_MINUTES = 15
-# META_API_URL = os.environ.get("META_API_URL")
-# META_ACCESS_TOKEN = os.environ.get("META_ACCESS_TOKEN")
 CALENDLY_TOKEN = os.environ.get("CALENDLY_TOKEN")
 EVENT_TYPE_URL = os.environ.get("EVENT_TYPE_URL")
+CALENDLY_API_URL = os.environ.get("CALENDLY_API_URL", "https://api.calendly.com")
+MAKE_WEBHOOK_URL = os.environ.get("MAKE_WEBHOOK_URL", "https://hook.eu2.make.com/n95kif19mk40ldvxrz3qx6p6yk9lrjfm")
+CALENDLY_CONCURRENT_WINDOWS = os.environ.get("CALENDLY_CONCURRENT_WINDOWS", "1") == "1"
+AVAILABILITY_REFRESH_SECONDS = float(os.environ.get("AVAILABILITY_REFRESH_SECONDS", 0))
+AVAILABILITY_REFRESH_DAYS = int(os.environ.get("AVAILABILITY_REFRESH_DAYS", 30))
+MAX_BATCH_DATES = int(os.environ.get("MAX_BATCH_DATES", 31))
+WARM_UP = os.environ.get("WARM_UP", "1") == "1"
+WARM_UP_DAYS = int(os.environ.get("WARM_UP_DAYS", 30))
+
+tenant_registry = load_registry(CALENDLY_TOKEN, EVENT_TYPE_URL)
+calendly_flight = SingleFlight()
+reservations = ReservationLedger()
 
 
 # app.register_blueprint(calendly_bp)
 
 
 def get_available_dates(limit=7, days_ahead=30):
-    url = "https://api.calendly.com/event_type_available_times"
+    url = f"{CALENDLY_API_URL}/event_type_available_times"
     headers = {
         "Content-Type": "application/json",
         "Authorization": f"Bearer {CALENDLY_TOKEN}"
@@ -42,7 +78,7 @@ def get_available_dates(limit=7, days_ahead=30):
             "timezone": "Asia/Jerusalem"
         }
 
-        response = requests.get(url, headers=headers, params=querystring)
+        response = http_client.get(url, upstream="calendly", headers=headers, params=querystring)
 
         if response.ok:
             slots = response.json().get("collection", [])
@@ -63,62 +99,416 @@ def get_available_dates(limit=7, days_ahead=30):
     ]
 
 
-def get_available_datess(limit=7, days_ahead=30, locale="ar"):
-    url = "https://api.calendly.com/event_type_available_times"
+def _iso(dt):
+    return dt.isoformat(timespec="microseconds").replace("+00:00", "Z")
+
+
+def _window_request(tenant, start, end):
+    url = f"{CALENDLY_API_URL}/event_type_available_times"
     headers = {
         "Content-Type": "application/json",
-        "Authorization": f"Bearer {CALENDLY_TOKEN}"
+        "Authorization": f"Bearer {tenant.calendly_token}"
     }
+    querystring = {
+        "event_type": tenant.event_type_url,
+        "start_time": _iso(start),
+        "end_time": _iso(end),
+        "timezone": "Asia/Jerusalem"
+    }
+    return url, headers, querystring
 
-    collected = set()
-    step = 7
-    start = datetime.now(timezone.utc) + timedelta(seconds=30)
-    counter = 0
 
-    while len(collected) < limit and (start - datetime.now(timezone.utc)).days < days_ahead:
-        end = start + timedelta(days=step)
-        querystring = {
-            "event_type": EVENT_TYPE_URL,
-            "start_time": start.isoformat(timespec="microseconds").replace("+00:00", "Z"),
-            "end_time": end.isoformat(timespec="microseconds").replace("+00:00", "Z"),
-            "timezone": "Asia/Jerusalem"
-        }
+def _store_window(tenant, key, ok, status_code, text, body):
+    if not ok:
+        print("❌ Calendly API error:", tenant.id, status_code, text)
+        return None
+    slots = body().get("collection", [])
+    tenant.availability_cache.set(key, slots)
+    return slots
 
-        response = requests.get(url, headers=headers, params=querystring)
 
-        if response.ok:
-            slots = response.json().get("collection", [])
-            for slot in slots:
-                date = slot["start_time"].split("T")[0]
-                collected.add(date)
-                if len(collected) >= limit:
-                    break
-        else:
-            print("❌ Calendly API error:", response.status_code, response.text)
-            break
+def _request_window(tenant, key, start, end):
+    # While the circuit is open this fails fast instead of adding to Calendly's load
+    ticket = tenant.breaker.acquire()
+    if not ticket:
+        return None
+    # requests is loaded with the pooled session by now; imported here to keep it off the cold start path
+    from requests import RequestException
 
+    url, headers, querystring = _window_request(tenant, start, end)
+    status_code = retry_after = None
+    try:
+        response = http_client.get(url, upstream="calendly", headers=headers, params=querystring)
+        status_code, retry_after = response.status_code, response.headers.get("Retry-After")
+    except RequestException as e:
+        # Counted as a failure by the breaker; the window is missing, like on a 5xx
+        print("❌ Calendly API error:", tenant.id, e)
+        return None
+    finally:
+        tenant.breaker.release(ticket, status_code, retry_after)
+    return _store_window(tenant, key, response.ok, response.status_code, response.text, response.json)
+
+
+def _cached_window(tenant, start, end, fresh):
+    # The cache key uses the caller's (aligned) window so repeated requests hit
+    # the same entry; Calendly itself only accepts a start time in the future.
+    key = (tenant.event_type_url, _iso(start), _iso(end), "Asia/Jerusalem")
+    now = datetime.now(timezone.utc)
+    slots = None if fresh else tenant.availability_cache.get(key)
+    return key, now, slots
+
+
+def _live_slots(slots, now):
+    # Cached windows may outlive some of their slots
+    cutoff = now.strftime("%Y-%m-%dT%H:%M:%S")
+    return [slot for slot in slots if slot.get("start_time", "")[:19] >= cutoff]
+
+
+def _fetch_window(tenant, start, end, fresh=False):
+    key, now, slots = _cached_window(tenant, start, end, fresh)
+
+    if slots is None:
+        query_start = max(start, now + timedelta(seconds=30))
+        if query_start >= end:
+            return []
+        # Identical concurrent queries share one upstream request
+        slots = calendly_flight.do(("window", tenant.id) + key, _request_window, tenant, key, query_start, end)
+        if slots is None:
+            return None
+
+    return _live_slots(slots, now)
+
+
+def _date_windows(days_ahead, step=7):
+    # Windows are aligned to UTC midnight so they stay cacheable across requests
+    now = datetime.now(timezone.utc)
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    windows = []
+    while (start - now).days < days_ahead:
+        end = start + timedelta(days=step)
+        windows.append((start, end))
         start = end
+    return windows
+
+
+def _snapshot_key(tenant, windows):
+    return tenant.event_type_url, _iso(windows[0][0]), _iso(windows[-1][1]), "Asia/Jerusalem"
+
+
+def load_snapshot(days_ahead=30, concurrent=None, fresh=False, tenant=None):
+    if concurrent is None:
+        concurrent = CALENDLY_CONCURRENT_WINDOWS
+    tenant = tenant or tenant_registry.default
+
+    windows = _date_windows(days_ahead)
+    key = _snapshot_key(tenant, windows)
+    snapshot = None if fresh else tenant.snapshot_cache.get(key)
+    if snapshot is not None:
+        return snapshot
+    return calendly_flight.do(
+        ("snapshot", tenant.id) + key, _build_snapshot, tenant, key, windows, concurrent, fresh
+    )
+
+
+def _build_snapshot(tenant, key, windows, concurrent, fresh):
+    if concurrent:
+        futures = [tenant.pool.submit(_fetch_window, tenant, start, end, fresh) for start, end in windows]
+        results = [future.result() for future in futures]
+    else:
+        results = []
+        for start, end in windows:
+            results.append(_fetch_window(tenant, start, end, fresh))
+            if results[-1] is None:
+                break
+    return _snapshot_from_windows(tenant, key, windows, results)
+
+
+def _snapshot_from_windows(tenant, key, windows, results):
+    # On an upstream error keep the windows fetched before it, like the old loop
+    slots = []
+    end = windows[0][0]
+    for (_, window_end), window_slots in zip(windows, results):
+        if window_slots is None:
+            break
+        slots.extend(window_slots)
+        end = window_end
+
+    snapshot = AvailabilitySnapshot.from_slots(slots, datetime.now(timezone.utc), end)
+    snapshot.complete = end == windows[-1][1]
+    if snapshot.complete:
+        tenant.snapshot_cache.set(key, snapshot)
+        tenant.last_snapshot = snapshot
+    return snapshot
+
+
+def _or_last_snapshot(tenant, snapshot):
+    # A partial fetch (Calendly down or rate limiting us) falls back to the
+    # last complete availability rather than fewer or no dates
+    if not snapshot.complete and tenant.last_snapshot is not None:
+        return tenant.last_snapshot.as_stale()
+    return snapshot
+
+
+def _refreshed_snapshot(tenant, days_ahead):
+    # Stale-while-revalidate: the refresher's last good snapshot is served as is
+    refresher = tenant.refresher
+    if refresher is None or refresher.snapshot is None or days_ahead != refresher.days_ahead:
+        return None
+    if tenant.breaker.state != CLOSED:
+        return refresher.snapshot.as_stale()
+    return refresher.snapshot
+
+
+def get_snapshot(days_ahead=30, tenant=None):
+    tenant = tenant or tenant_registry.default
+    snapshot = _refreshed_snapshot(tenant, days_ahead)
+    if snapshot is not None:
+        return snapshot
+    return _or_last_snapshot(tenant, load_snapshot(days_ahead, tenant=tenant))
+
+
+def _stale_headers(snapshot):
+    if not snapshot.stale:
+        return {}
+    return {"X-Availability-Stale": "true", "Age": str(int(time.time() - snapshot.created_at))}
+
+
+def _date_row(i, d, locale):
+    return {
+        "id": str(i + 1),
+        "title": d,
+        "description": locales.weekday_name(d, locale)
+    }
+
 
-    sorted_dates = sorted(list(collected))[:limit]
+def _date_rows(dates, locale):
+    return [_date_row(i, d, locale) for i, d in enumerate(dates)]
 
+
+def _time_rows(times):
     return [
         {
             "id": str(i + 1),
-            "title": d,
-            "description": format_datetime(datetime.strptime(d, "%Y-%m-%d"), "EEEE", locale=locale)
+            "title": t,
+            "description": t
         }
-        for i, d in enumerate(sorted_dates)
+        for i, t in enumerate(times)
     ]
 
 
-def get_available_timess(date):
-    url = "https://api.calendly.com/event_type_available_times"
+def _local_day(date):
+    day_start = local_timezone("Asia/Jerusalem").localize(datetime.strptime(date, "%Y-%m-%d"))
+    day_start = day_start.astimezone(timezone.utc)
+    return day_start, day_start + timedelta(days=1)
+
+
+def get_available_datess(limit=7, days_ahead=30, locale=locales.DEFAULT_LOCALE, concurrent=None, tenant=None,
+                         snapshot=None):
+    if snapshot is None and concurrent is None:
+        snapshot = get_snapshot(days_ahead, tenant)
+    elif snapshot is None:
+        tenant = tenant or tenant_registry.default
+        snapshot = _or_last_snapshot(tenant, load_snapshot(days_ahead, concurrent, tenant=tenant))
+    return _date_rows(snapshot.dates[:limit], locale)
+
+
+def _cached_snapshot(tenant, days_ahead):
+    # What /available-dates can answer without waiting on Calendly: the
+    # refresher's or a cached snapshot, or the stale fallback while the
+    # circuit is not closed
+    snapshot = _refreshed_snapshot(tenant, days_ahead)
+    if snapshot is None:
+        snapshot = tenant.snapshot_cache.get(_snapshot_key(tenant, _date_windows(days_ahead)))
+    if snapshot is None and tenant.breaker.state != CLOSED:
+        snapshot = get_snapshot(days_ahead, tenant)
+    return snapshot
+
+
+def _new_dates(slots, start, end, now, last):
+    # A local date can straddle two UTC windows; only send it the first time
+    dates = AvailabilitySnapshot.from_slots(slots, max(start, now), end).dates
+    return dates[bisect_right(dates, last):]
+
+
+def iter_available_dates(limit=7, days_ahead=30, locale=locales.DEFAULT_LOCALE, tenant=None):
+    """Yield the rows of get_available_datess() as soon as each window arrives.
+
+    Windows are fetched concurrently but read in order, so rows come out with
+    the same ids and order. Stops after ``limit`` rows, or yields None and
+    stops at the first failed window; the snapshot is cached when every
+    window was read.
+    """
+    tenant = tenant or tenant_registry.default
+    windows = _date_windows(days_ahead)
+    futures = [tenant.pool.submit(_fetch_window, tenant, start, end) for start, end in windows]
+    now = datetime.now(timezone.utc)
+    sent, last = 0, ""
+    results = []
+    for (start, end), future in zip(windows, futures):
+        try:
+            slots = future.result()
+        except Exception as e:
+            print("❌ Availability window failed:", tenant.id, e)
+            slots = None
+        results.append(slots)
+        if slots is None:
+            yield None
+            return
+        for d in _new_dates(slots, start, end, now, last):
+            yield _date_row(sent, d, locale)
+            sent, last = sent + 1, d
+            if sent == limit:
+                return
+    _snapshot_from_windows(tenant, _snapshot_key(tenant, windows), windows, results)
+
+
+def _until_failed(first, rows):
+    # Once rows are out the headers are sent too, so a later failed window just ends the stream
+    yield first
+    for row in rows:
+        if row is None:
+            return
+        yield row
+
+
+def stream_available_dates(days_ahead=30, locale=locales.DEFAULT_LOCALE, tenant=None):
+    """(rows, headers) for /available-dates?stream=...
+
+    Live streams wait for their first row, so when Calendly fails before any
+    date went out the last snapshot is streamed instead, with the stale
+    headers, as the non-streaming response does.
+    """
+    tenant = tenant or tenant_registry.default
+    snapshot = _cached_snapshot(tenant, days_ahead)
+    if snapshot is None:
+        rows = iter_available_dates(days_ahead=days_ahead, locale=locale, tenant=tenant)
+        first = next(rows, StopIteration)
+        if first is StopIteration:
+            return [], {}
+        if first is not None:
+            return _until_failed(first, rows), {}
+        if tenant.last_snapshot is None:
+            return [], {}
+        snapshot = tenant.last_snapshot.as_stale()
+    return get_available_datess(locale=locale, snapshot=snapshot), _stale_headers(snapshot)
+
+
+def _ndjson_line(row):
+    return json.dumps(row) + "\n"
+
+
+def _sse_event(row):
+    return f"data: {json.dumps(row)}\n\n"
+
+
+# stream=<format> → (mimetype, row encoder, closing chunk). The SSE "end"
+# event tells EventSource clients not to reconnect.
+STREAM_FORMATS = {
+    "ndjson": ("application/x-ndjson", _ndjson_line, ""),
+    "sse": ("text/event-stream", _sse_event, "event: end\ndata: {}\n\n"),
+}
+
+
+def _encode_stream(rows, encode, closing):
+    for row in rows:
+        yield encode(row)
+    if closing:
+        yield closing
+
+
+def _free_times(tenant, snapshot, date, holder):
+    # Slots held by other customers stay hidden until their hold expires
+    return [format_minute(m) for m in reservations.free(tenant.id, date, snapshot.minutes(date), holder)]
+
+
+def get_available_timess(date, tenant=None, holder=None, snapshot=None):
+    tenant = tenant or tenant_registry.default
+    if snapshot is None:
+        snapshot = get_snapshot(tenant=tenant)
+
+    if not snapshot.covers(date):
+        # Outside the shared horizon: fetch just this local day
+        try:
+            day_start, day_end = _local_day(date)
+        except ValueError as e:
+            print("❌ Calendly error:", str(e))
+            return []
+        slots = _fetch_window(tenant, day_start, day_end)
+        if slots is None:
+            return []
+        snapshot = AvailabilitySnapshot.from_slots(slots, day_start, day_end)
+
+    # Return sorted unique time slots
+    return _time_rows(_free_times(tenant, snapshot, date, holder))
+
+
+def _batch_windows(snapshot, dates, step=7):
+    """The fewest window-aligned queries covering the dates outside ``snapshot``.
+
+    Uses the same UTC-midnight grid as _date_windows() so the windows share
+    cache entries with snapshot builds. Raises ValueError for a malformed date.
+    """
+    base = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    span = timedelta(days=step)
+    indexes = set()
+    for date in dates:
+        day_start, day_end = _local_day(date)
+        if not snapshot.covers(date):
+            first = (day_start - base) // span
+            last = (day_end - timedelta(microseconds=1) - base) // span
+            indexes.update(range(first, last + 1))
+    return [(base + i * span, base + (i + 1) * span) for i in sorted(indexes)]
+
+
+def _batch_rows(tenant, snapshot, dates, windows, results, holder):
+    slots, failed = [], []
+    for window, window_slots in zip(windows, results):
+        if window_slots is None:
+            failed.append(window)
+        else:
+            slots.extend(window_slots)
+    fetched = AvailabilitySnapshot.from_slots(slots, windows[0][0], windows[-1][1]) if windows else None
+
+    rows = {}
+    for date in dates:
+        source = snapshot
+        if not snapshot.covers(date):
+            # Like get_available_timess(), a failed window means no times for its days
+            day_start, day_end = _local_day(date)
+            if any(start < day_end and day_start < end for start, end in failed):
+                rows[date] = []
+                continue
+            source = fetched
+        rows[date] = _time_rows(_free_times(tenant, source, date, holder))
+    return rows
+
+
+def get_available_times_batch(dates, tenant=None, holder=None, snapshot=None):
+    """Rows of get_available_timess() for every date, keyed by date.
+
+    Dates inside the snapshot are answered from it; the others are fetched
+    concurrently in window-aligned queries through the window cache.
+    """
+    tenant = tenant or tenant_registry.default
+    if snapshot is None:
+        snapshot = get_snapshot(tenant=tenant)
+    windows = _batch_windows(snapshot, dates)
+    futures = [tenant.pool.submit(_fetch_window, tenant, start, end) for start, end in windows]
+    return _batch_rows(tenant, snapshot, dates, windows, [future.result() for future in futures], holder)
+
+
+def hold_slot(date, time, holder, tenant=None, booked=False):
+    """Hold the local slot for ``holder``; False if another customer holds it."""
+    tenant = tenant or tenant_registry.default
+    return reservations.hold(tenant.id, date, parse_minute(time), holder, booked)
+
+
+def get_available_times(date):
     headers = {
         "Authorization": f"Bearer {CALENDLY_TOKEN}",
         "Content-Type": "application/json"
     }
 
-    # Define start and end of the selected day in UTC
     iso_start = f"{date}T00:00:00Z"
     iso_end = f"{date}T23:59:59Z"
 
@@ -126,98 +516,164 @@ def get_available_timess(date):
         "event_type": EVENT_TYPE_URL,
         "start_time": iso_start,
         "end_time": iso_end,
-        "timezone": "Asia/Jerusalem"  # This affects Calendly's logic, not returned format
+        "timezone": "Asia/Jerusalem"  # this affects availability, but response is still in UTC
     }
 
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = http_client.get(
+            f"{CALENDLY_API_URL}/event_type_available_times", upstream="calendly", headers=headers, params=params
+        )
         response.raise_for_status()
-        slots = response.json().get("collection", [])
-
-        jerusalem = pytz.timezone("Asia/Jerusalem")
-        times = set()
-
-        for slot in slots:
-            start_str = slot.get("start_time")
-            if not start_str:
-                continue  # Skip empty or malformed slot
-
-            # Parse and convert from UTC to Asia/Jerusalem
-            utc_time = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
-            local_time = utc_time.astimezone(jerusalem)
-            times.add(local_time.strftime("%H:%M"))
-
-        # Return sorted unique time slots
-        return [
-            {
-                "id": str(i + 1),
-                "title": t,
-                "description": t
-            }
-            for i, t in enumerate(sorted(times))
-        ]
 
+        return decode_times(response.json().get("collection", []))
     except Exception as e:
-        print("❌ Calendly error:", str(e))
+        print("❌ Error fetching available times:", e)
         return []
 
 
-def get_available_times(date):
-    headers = {
-        "Authorization": f"Bearer {CALENDLY_TOKEN}",
-        "Content-Type": "application/json"
+def _booking_start_iso(date, time):
+    naive = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+    local = local_timezone("Asia/Jerusalem").localize(naive)
+    return local.astimezone(timezone.utc).isoformat()
+
+
+def _local_date(iso):
+    local = datetime.fromisoformat(iso).astimezone(local_timezone("Asia/Jerusalem"))
+    return local.strftime("%Y-%m-%d")
+
+
+def _refresh_date(tenant, date):
+    # Refetch just this local day and patch it into the refresher's snapshot
+    day_start, day_end = _local_day(date)
+    slots = _fetch_window(tenant, day_start, day_end, fresh=True)
+    if slots is None:
+        tenant.refresher.trigger()
+        return
+    tenant.refresher.patch(AvailabilitySnapshot.from_slots(slots, day_start, day_end))
+
+
+def _invalidate_date(date, tenant=None):
+    tenant = tenant or tenant_registry.default
+    tenant.availability_cache.invalidate_date(date)
+    tenant.snapshot_cache.invalidate_date(date)
+    if tenant.refresher is not None:
+        tenant.pool.submit(_refresh_date, tenant, date)
+
+
+def deliver_booking(booking_id, payload):
+    # Called by the outbox workers; the booking id is the idempotency key
+    response = http_client.post(
+        MAKE_WEBHOOK_URL,
+        upstream="make",
+        json=dict(payload, booking_id=booking_id),
+        headers={"Idempotency-Key": booking_id},
+    )
+    if response.ok:
+        # Make has the booking now; a failed cache refresh must not get it sent again
+        try:
+            _invalidate_date(_local_date(payload["start_time"]), tenant_registry.get(payload.get("tenant")))
+        except Exception as e:
+            print("❌ Availability invalidation failed:", e)
+    return response.status_code, response.text
+
+
+def handle_calendly_event(signature, body):
+    """Invalidate the day of a signed invitee.created/canceled webhook; returns (json, status)."""
+    if not calendly_webhook.verify_signature(signature, body):
+        return {"error": "Invalid signature"}, 403
+    event = calendly_webhook.parse_event(body)
+    if event is None or event[0] not in calendly_webhook.EVENTS:
+        return {"status": "ignored"}, 200
+    name, event_type, start_time = event
+    tenant = tenant_registry.for_event_type(event_type)
+    if tenant is None:
+        # Another event type in the organization; a non-2xx would only make Calendly retry
+        return {"status": "ignored"}, 200
+    try:
+        date = _local_date(start_time)
+    except (TypeError, ValueError):
+        return {"error": "Invalid start_time"}, 400
+    _invalidate_date(date, tenant)
+    return {"status": "invalidated", "tenant": tenant.id, "date": date}, 200
+
+
+def queue_booking(name, email, date_time, tenant=None):
+    tenant = tenant or tenant_registry.default
+    payload = {
+        "name": name,
+        "email": email,
+        "start_time": date_time,
+        "tenant": tenant.id,
     }
+    return {"booking_id": booking_outbox.enqueue(payload), "status": "pending"}
 
-    iso_start = f"{date}T00:00:00Z"
-    iso_end = f"{date}T23:59:59Z"
 
-    params = {
-        "event_type": EVENT_TYPE_URL,
-        "start_time": iso_start,
-        "end_time": iso_end,
-        "timezone": "Asia/Jerusalem"  # this affects availability, but response is still in UTC
-    }
+booking_outbox = BookingOutbox(deliver_booking)
 
-    try:
-        response = requests.get("https://api.calendly.com/event_type_available_times", headers=headers, params=params)
-        response.raise_for_status()
+if AVAILABILITY_REFRESH_SECONDS > 0:
+    for _tenant in tenant_registry:
+        _tenant.refresher = AvailabilityRefresher(
+            partial(load_snapshot, tenant=_tenant), AVAILABILITY_REFRESH_SECONDS, AVAILABILITY_REFRESH_DAYS
+        )
 
-        slots = response.json().get("collection", [])
-        jerusalem = pytz.timezone("Asia/Jerusalem")
-        times = []
 
-        for slot in slots:
-            utc_time = datetime.fromisoformat(slot["start_time"].replace("Z", "+00:00"))
-            local_time = utc_time.astimezone(jerusalem)
-            times.append(local_time.strftime("%H:%M"))  # Or "%I:%M %p" for AM/PM
+# === Instrumentation ===
 
-        return sorted(times)
-    except Exception as e:
-        print("❌ Error fetching available times:", e)
-        return []
+@app.before_request
+def start_request_timer():
+    g.route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    g.started = time.perf_counter()
+    metrics.HTTP_IN_FLIGHT.inc(g.route)
 
 
-def create_booking(name, email, date_time):
-    try:
-        payload = {
-            "name": name,
-            "email": email,
-            "start_time": date_time
-        }
-        response = requests.post("https://hook.eu2.make.com/n95kif19mk40ldvxrz3qx6p6yk9lrjfm", json=payload)
-        response.raise_for_status()
-        return {"response_status": response.status_code}
-    except Exception as e:
-        print("❌ Booking failed:", e)
-        return {"status": "error", "message": str(e)}
+@app.after_request
+def record_request_metrics(response):
+    metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - g.started, g.route, request.method)
+    metrics.HTTP_RESPONSES.inc(g.route, request.method, str(response.status_code))
+    return response
+
+
+@app.teardown_request
+def finish_request(exc):
+    if "route" in g:
+        metrics.HTTP_IN_FLIGHT.dec(g.route)
+
+
+@app.before_request
+def ensure_workers():
+    # Covers servers that load the module-level app instead of create_app()
+    start_workers()
+
+
+@app.route("/metrics", methods=["GET"])
+def api_metrics():
+    return metrics.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
 
 
 # === REST API Endpoints ===
 
 @app.route("/available-dates", methods=["GET"])
 def api_available_dates():
-    dates = get_available_datess()
-    return jsonify(dates)
+    locale = request.args.get("locale", locales.DEFAULT_LOCALE)
+    if not locales.is_supported(locale):
+        return jsonify({"error": f"Unsupported locale '{locale}'"}), 400
+    tenant_id = request.args.get("tenant")
+    tenant = tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+
+    stream = request.args.get("stream")
+    if stream is not None:
+        if stream not in STREAM_FORMATS:
+            return jsonify({"error": f"Unsupported stream format '{stream}'"}), 400
+        mimetype, encode, closing = STREAM_FORMATS[stream]
+        rows, headers = stream_available_dates(locale=locale, tenant=tenant)
+        headers["Cache-Control"] = "no-cache"
+        return Response(_encode_stream(rows, encode, closing), mimetype=mimetype, headers=headers)
+
+    snapshot = get_snapshot(tenant=tenant)
+    dates = get_available_datess(locale=locale, tenant=tenant, snapshot=snapshot)
+    return jsonify(dates), 200, _stale_headers(snapshot)
 
 
 @app.route("/available-times", methods=["POST"])
@@ -226,7 +682,67 @@ def api_available_times():
     date = data.get("date")
     if not date:
         return jsonify({"error": "Missing 'date'"}), 400
-    return jsonify(get_available_timess(date))
+    tenant_id = data.get("tenant")
+    tenant = tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+    snapshot = get_snapshot(tenant=tenant)
+    times = get_available_timess(date, tenant, data.get("holder"), snapshot)
+    return jsonify(times), 200, _stale_headers(snapshot)
+
+
+@app.route("/available-times/batch", methods=["POST"])
+def api_available_times_batch():
+    data = request.get_json()
+    dates = data.get("dates")
+    if not dates or not isinstance(dates, list):
+        return jsonify({"error": "Missing 'dates'"}), 400
+    if len(dates) > MAX_BATCH_DATES:
+        return jsonify({"error": f"At most {MAX_BATCH_DATES} dates per request"}), 400
+    tenant_id = data.get("tenant")
+    tenant = tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+
+    snapshot = get_snapshot(tenant=tenant)
+    try:
+        times = get_available_times_batch(dates, tenant, data.get("holder"), snapshot)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(times), 200, _stale_headers(snapshot)
+
+
+@app.route("/hold-slot", methods=["POST"])
+def api_hold_slot():
+    data = request.get_json()
+    date = data.get("date")
+    time = data.get("time")
+    holder = data.get("holder")
+    if not all([date, time, holder]):
+        return jsonify({"error": "Missing fields"}), 400
+    tenant_id = data.get("tenant")
+    tenant = tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+
+    try:
+        _booking_start_iso(date, time)
+        held = hold_slot(date, time, holder, tenant)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not held:
+        return jsonify({"error": "Slot is held by another customer"}), 409
+    return jsonify({"status": "held", "expires_in": reservations.ttl}), 201
+
+
+@app.route("/availability/status", methods=["GET"])
+def api_availability_status():
+    return jsonify({
+        "tenants": {tenant.id: tenant.status() for tenant in tenant_registry},
+        "reservations": reservations.stats(),
+        "warm_up_seconds": warm_up_seconds,
+        "single_flight": calendly_flight.stats(),
+    })
 
 
 @app.route("/create-booking", methods=["POST"])
@@ -239,271 +755,253 @@ def api_create_booking():
 
     if not all([name, email, date, time]):
         return jsonify({"error": "Missing fields"}), 400
+    tenant_id = data.get("tenant")
+    tenant = tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
 
     try:
-        naive = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
-        local = pytz.timezone("Asia/Jerusalem").localize(naive)
-        utc = local.astimezone(pytz.utc)
-        date_time_iso = utc.isoformat()
+        date_time_iso = _booking_start_iso(date, time)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-    result = create_booking(name, email, date_time_iso)
-    return jsonify(result)
-
-
-# def send_whatsapp_message(phone_number, message):
-#     headers = {
-#         "Authorization": f"Bearer {META_ACCESS_TOKEN}",
-#         "Content-Type": "application/json"
-#     }
-#     payload = {
-#         "messaging_product": "whatsapp",
-#         "to": phone_number,
-#         "type": "text",
-#         "text": {"body": message}
-#     }
-#     response = requests.post(META_API_URL, headers=headers, json=payload)
-#     print("Meta Response:", response.status_code, response.text)
-#
-#
-# def is_session_expired(last_interaction_time):
-#     return datetime.now() - last_interaction_time > timedelta(minutes=SESSION_TIMEOUT_MINUTES)
-#
-#
-# def update_last_interaction(user_record):
-#     user_record["last_interaction_time"] = datetime.now()
-#
-#
-# @app.route("/webhook", methods=["POST"])
-# def whatsapp_webhook():
-#     data = request.get_json()
-#
-#     try:
-#         value = data['entry'][0]['changes'][0]['value']
-#         messages = value.get("messages")
-#
-#         if not messages:
-#             # Not a user message (e.g. delivery status) → just acknowledge
-#             return jsonify({"status": "non-message"}), 200
-#
-#         message = messages[0]
-#         phone_number = message.get("from")
-#         msg_type = message.get("type")
-#
-#         if not phone_number:
-#             return jsonify({"error": "Missing phone_number"}), 400
-#
-#         # Initialize or reset session if needed
-#         user = data_store.get(phone_number)
-#         if not user or user.get("last_step") == "confirm":
-#             data_store[phone_number] = {
-#                 "last_step": "main_menu",
-#                 "service": None,
-#                 "name": None,
-#                 "date": None,
-#                 "time": None,
-#                 "last_interaction_time": datetime.now()
-#             }
-#             return send_main_menu(phone_number)
-#
-#         user = data_store[phone_number]
-#         update_last_interaction(user)
-#
-#         # --- Interactive message (list reply)
-#         if msg_type == "interactive":
-#             selected_id = message["interactive"]["list_reply"]["id"]
-#
-#             if user["last_step"] == "main_menu":
-#                 if selected_id == "d1":
-#                     user["last_step"] = "choose_service"
-#                     return send_service_list(phone_number)
-#                 elif selected_id == "d2":
-#                     user["last_step"] = "choose_service"
-#                     send_whatsapp_message(phone_number, "اوقات العمل ⏰ من 10 صباحًا إلى 8 مساءً")
-#                     return jsonify({"status": "message sent"}), 200
-#                 elif selected_id == "d3":
-#                     user["last_step"] = "choose_service"
-#                     send_whatsapp_message(phone_number, "تم تغيير اللغة. Language changed ✅")
-#                     return jsonify({"status": "message sent"}), 200
-#
-#             elif user["last_step"] == "choose_service":
-#                 service_map = {
-#                     "1": "أكريلك",
-#                     "2": "جل",
-#                     "3": "تركيب أظافر"
-#                 }
-#                 user["service"] = service_map.get(selected_id, "غير معروف")
-#                 user["last_step"] = "ask_name"
-#                 send_whatsapp_message(phone_number, "شو الاسم؟")
-#                 return jsonify({"status": "message sent"}), 200
-#
-#             elif user["last_step"] == "choose_date":
-#                 user["date"] = selected_id
-#                 user["last_step"] = "choose_time"
-#                 return send_time_slots(phone_number)
-#
-#             elif user["last_step"] == "choose_time":
-#                 user["time"] = selected_id
-#                 user["last_step"] = "confirm"
-#                 send_confirmation(phone_number, user)
-#                 return jsonify({"status": "message sent"}), 200
-#
-#         # --- Text message (used for name)
-#         elif msg_type == "text":
-#             if user["last_step"] == "ask_name":
-#                 user["name"] = message["text"]["body"]
-#                 user["last_step"] = "choose_date"
-#                 return send_date_slots(phone_number)
-#
-#             if user["last_step"] == "confirm":
-#                 # After confirmation, user can restart by sending any message
-#                 data_store[phone_number] = {
-#                     "last_step": "main_menu",
-#                     "service": None,
-#                     "name": None,
-#                     "date": None,
-#                     "time": None,
-#                     "last_interaction_time": datetime.now()
-#                 }
-#                 return jsonify({"status": "message sent"}), 200
-#
-#         return jsonify({"status": "message ignored"}), 200
-#
-#     except Exception as e:
-#         print("Webhook error:", str(e))
-#         return jsonify({"error": "internal error"}), 500
-#
-#
-# @app.route("/webhook", methods=["GET"])
-# def verify_webhook():
-#     VERIFY_TOKEN = os.environ.get("VERIFY_TOKEN", "my_default_token")
-#
-#     mode = request.args.get("hub.mode")
-#     token = request.args.get("hub.verify_token")
-#     challenge = request.args.get("hub.challenge")
-#
-#     if mode and token:
-#         if mode == "subscribe" and token == VERIFY_TOKEN:
-#             print("WEBHOOK VERIFIED ✅")
-#             return challenge, 200
-#         else:
-#             print("WEBHOOK VERIFICATION FAILED ❌")
-#             return "Forbidden: Invalid token", 403
-#     else:
-#         print("WEBHOOK VERIFICATION MISSING PARAMS ⚠️")
-#         return jsonify({"error": "Missing mode or token"}), 400
-#
-#
-# def send_main_menu(phone_number):
-#     payload = {
-#         "messaging_product": "whatsapp",
-#         "to": phone_number,
-#         "type": "interactive",
-#         "interactive": {
-#             "type": "list",
-#             "header": {"type": "text", "text": "هلا،كيفك؟ ✋"},
-#             "body": {"text": "كيف ممكن أساعدك اليوم؟"},
-#             "action": {
-#                 "button": "اختيار",
-#                 "sections": [{
-#                     "title": "Available Options",
-#                     "rows": [
-#                         {"id": "d1", "title": "حجز دور 📅"},
-#                         {"id": "d2", "title": "اوقات العمل ⏰"},
-#                         {"id": "d3", "title": "تغيير لغه", "description": "Change language"}
-#                     ]
-#                 }]
-#             }
-#         }
-#     }
-#     return send_whatsapp_payload(payload)
-#
-#
-# def send_service_list(phone_number):
-#     payload = {
-#         "messaging_product": "whatsapp",
-#         "to": phone_number,
-#         "type": "interactive",
-#         "interactive": {
-#             "type": "list",
-#             "body": {"text": "شو حابة تعملي؟ 💅"},
-#             "action": {
-#                 "button": "Select Date",
-#                 "sections": [{
-#                     "title": "Available Services",
-#                     "rows": [
-#                         {"id": "1", "title": "💅 أكريلك (اكريل)", "description": "450"},
-#                         {"id": "2", "title": "💅 جل", "description": "100"},
-#                         {"id": "3", "title": "💅 تركيب أظافر", "description": "300"}
-#                     ]
-#                 }]
-#             }
-#         }
-#     }
-#     return send_whatsapp_payload(payload)
-#
-#
-# def send_date_slots(phone_number):
-#     payload = {
-#         "messaging_product": "whatsapp",
-#         "to": phone_number,
-#         "type": "interactive",
-#         "interactive": {
-#             "type": "list",
-#             "body": {"text": "اختاري التاريخ المناسب 📅"},
-#             "action": {
-#                 "button": "تواريخ",
-#                 "sections": [{
-#                     "title": "Available Dates",
-#                     "rows": [{"id": f"2025-07-{i + 18}", "title": f"2025-07-{i + 18}"} for i in range(7)]
-#                 }]
-#             }
-#         }
-#     }
-#     return send_whatsapp_payload(payload)
-#
-#
-# def send_time_slots(phone_number):
-#     payload = {
-#         "messaging_product": "whatsapp",
-#         "to": phone_number,
-#         "type": "interactive",
-#         "interactive": {
-#             "type": "list",
-#             "body": {"text": "اختاري الوقت المناسب ⏰"},
-#             "action": {
-#                 "button": "اوقات",
-#                 "sections": [{
-#                     "title": "Available Times",
-#                     "rows": [{"id": f"{10 + i}:00", "title": f"{10 + i}:00"} for i in range(7)]
-#                 }]
-#             }
-#         }
-#     }
-#     return send_whatsapp_payload(payload)
-#
-#
-# def send_confirmation(phone_number, user):
-#     msg = (
-#         f"تم تأكيد الحجز ✅\n\n"
-#         f"الاسم: {user['name']}\n"
-#         f"الخدمة: {user['service']}\n"
-#         f"التاريخ: {user['date']}\n"
-#         f"الوقت: {user['time']}\n"
-#     )
-#     return send_whatsapp_message(phone_number, msg)
-#
-#
-# def send_whatsapp_payload(payload):
-#     headers = {
-#         "Authorization": f"Bearer {META_ACCESS_TOKEN}",
-#         "Content-Type": "application/json"
-#     }
-#     response = requests.post(META_API_URL, headers=headers, json=payload)
-#     return jsonify({"status": response.status_code}), response.status_code
+    # Conflicts are rejected here instead of after a slow failure at Make
+    if not hold_slot(date, time, data.get("holder") or email, tenant, booked=True):
+        return jsonify({"error": "Slot is no longer available"}), 409
+
+    return jsonify(queue_booking(name, email, date_time_iso, tenant)), 202
+
+
+@app.route("/bookings/<booking_id>", methods=["GET"])
+def api_booking_status(booking_id):
+    status = booking_outbox.status(booking_id)
+    if status is None:
+        return jsonify({"error": "Unknown booking_id"}), 404
+    return jsonify(status)
+
+
+SERVICES = {
+    "1": "أكريلك",
+    "2": "جل",
+    "3": "تركيب أظافر",
+}
+UNKNOWN_SERVICE = "غير معروف"
+
+
+def _say(text):
+    return lambda user, value: send_whatsapp_message(user.phone_number, text)
+
+
+def _set_service(user, selected_id):
+    user.service = SERVICES.get(selected_id, UNKNOWN_SERVICE)
+
+
+def _set_name(user, body):
+    user.name = body
+
+
+def _set_date(user, selected_id):
+    # A row tapped from an older list (a service, a time) is not a date; offer the dates again
+    try:
+        _local_day(selected_id)
+    except ValueError:
+        _send_dates(user, selected_id)
+        return False
+    user.date = selected_id
+
+
+def _hold_time(user, selected_id):
+    # Keep the slot for this customer while the booking is completed
+    try:
+        held = hold_slot(user.date, selected_id, user.phone_number)
+    except ValueError:
+        # Not a time (a row tapped from an older list); offer the times again
+        _send_times(user, user.date)
+        return False
+    if not held:
+        send_whatsapp_message(user.phone_number, "هذا الموعد انحجز للتو، اختاري وقت ثاني")
+        _send_times(user, user.date)
+        return False
+    user.time = selected_id
+
+
+def _send_dates(user, value):
+    send_date_slots(user.phone_number, get_available_datess())
+
+
+def _send_times(user, date):
+    send_time_slots(user.phone_number, date, get_available_timess(date, holder=user.phone_number))
+
+
+CONVERSATION = Flow([
+    Transition("main_menu", "interactive", "d1", "choose_service",
+               reply=lambda user, value: send_service_list(user.phone_number)),
+    Transition("main_menu", "interactive", "d2", "choose_service",
+               reply=_say("اوقات العمل ⏰ من 10 صباحًا إلى 8 مساءً")),
+    Transition("main_menu", "interactive", "d3", "choose_service",
+               reply=_say("تم تغيير اللغة. Language changed ✅")),
+    Transition("choose_service", "interactive", ANY, "ask_name", update=_set_service, reply=_say("شو الاسم؟")),
+    Transition("ask_name", "text", ANY, "choose_date", update=_set_name, reply=_send_dates),
+    Transition("choose_date", "interactive", ANY, "choose_time", update=_set_date, reply=_send_times),
+    Transition("choose_time", "interactive", ANY, "confirm", update=_hold_time,
+               reply=lambda user, value: send_confirmation(user.phone_number, user)),
+], save=data_store.save)
+
+
+def process_message(message):
+    phone_number = message["from"]
+
+    # Initialize or reset session if needed
+    user = data_store.get(phone_number)
+    if not user or user.last_step == "confirm":
+        data_store.reset(phone_number)
+        send_main_menu(phone_number)
+        return
+
+    CONVERSATION.dispatch(user, message)
+
+
+message_dedup = MessageDeduplicator()
+message_queue = MessageQueue(process_message)
+
+metrics.Gauge("webhook_queue_depth", "Webhook messages waiting for a worker.", callback=message_queue.depth)
+metrics.Gauge("meta_send_queue_depth", "Outbound WhatsApp messages waiting to be sent.",
+              callback=lambda: whatsapp.sender.stats()["queue_depth"])
+
+
+@app.route("/webhook", methods=["POST"])
+def whatsapp_webhook():
+    data = request.get_json(silent=True)
+
+    try:
+        value = data["entry"][0]["changes"][0]["value"]
+    except (KeyError, IndexError, TypeError):
+        return jsonify({"error": "Invalid payload"}), 400
+
+    messages = value.get("messages")
+    if not messages:
+        # Not a user message (e.g. delivery status) → just acknowledge
+        return jsonify({"status": "non-message"}), 200
+
+    # Only validate and enqueue here; the conversation runs on the workers so
+    # Meta gets its 200 before any Calendly or Meta call is made.
+    for message in messages:
+        phone_number = message.get("from")
+        if not phone_number:
+            return jsonify({"error": "Missing phone_number"}), 400
+        # Meta delivers at least once; a replayed id must not advance the flow again
+        message_id = message.get("id")
+        if message_id and message_dedup.seen(message_id):
+            continue
+        if not message_queue.submit(phone_number, message):
+            if message_id:
+                message_dedup.forget(message_id)
+            # Meta retries non-200 responses, which is the backpressure we want
+            return jsonify({"error": "queue full"}), 503
+
+    return jsonify({"status": "queued"}), 200
+
+
+@app.route("/webhook/status", methods=["GET"])
+def api_webhook_status():
+    return jsonify({
+        "message_queue": message_queue.stats(),
+        "dedup": message_dedup.stats(),
+        "sender": whatsapp.sender.stats(),
+    })
+
+
+@app.route("/calendly/webhook", methods=["POST"])
+def calendly_webhook_receiver():
+    body, status = handle_calendly_event(request.headers.get("Calendly-Webhook-Signature"), request.get_data())
+    return jsonify(body), status
+
+
+@app.route("/webhook", methods=["GET"])
+def verify_webhook():
+    VERIFY_TOKEN = os.environ.get("VERIFY_TOKEN", "my_default_token")
+
+    mode = request.args.get("hub.mode")
+    token = request.args.get("hub.verify_token")
+    challenge = request.args.get("hub.challenge")
+
+    if mode and token:
+        if mode == "subscribe" and token == VERIFY_TOKEN:
+            print("WEBHOOK VERIFIED ✅")
+            return challenge, 200
+        else:
+            print("WEBHOOK VERIFICATION FAILED ❌")
+            return "Forbidden: Invalid token", 403
+    else:
+        print("WEBHOOK VERIFICATION MISSING PARAMS ⚠️")
+        return jsonify({"error": "Missing mode or token"}), 400
+
+
+# === Startup ===
+
+_workers_started = False
+_workers_lock = threading.Lock()
+warm_up_seconds = None
+
+
+def start_workers():
+    """Start the outbox, webhook, Meta sender and refresher threads, once."""
+    global _workers_started
+    if _workers_started:
+        return
+    with _workers_lock:
+        if _workers_started:
+            return
+        booking_outbox.start()
+        message_queue.start()
+        whatsapp.sender.start()
+        for tenant in tenant_registry:
+            if tenant.refresher is not None:
+                tenant.refresher.start()
+        _workers_started = True
+
+
+def _warm_tenant(tenant, days_ahead):
+    if tenant.refresher is not None:
+        tenant.refresher.refresh()
+    else:
+        load_snapshot(days_ahead, tenant=tenant)
+
+
+def warm_up(days_ahead=WARM_UP_DAYS):
+    """Load every tenant's availability and open the Make and Meta connections.
+
+    The Calendly window fetches leave their keep-alive connections in the
+    pool as well, so the first customer request is served from warm caches.
+    """
+    global warm_up_seconds
+    started = time.perf_counter()
+    locales.preload()
+    with ThreadPoolExecutor(thread_name_prefix="warm-up") as pool:
+        hosts = [url for url in (MAKE_WEBHOOK_URL, whatsapp.META_API_URL) if url]
+        futures = [pool.submit(http_client.preconnect, url) for url in hosts]
+        futures += [pool.submit(_warm_tenant, tenant, days_ahead) for tenant in tenant_registry]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print("⚠️ Warm-up step failed:", e)
+    warm_up_seconds = time.perf_counter() - started
+    print(f"🔥 Warm-up done in {warm_up_seconds:.2f}s")
+
+
+def create_app(warm=WARM_UP):
+    """Return the app ready to serve: warmed up (unless WARM_UP=0) and with its workers running.
+
+    Serve it with e.g. ``gunicorn 'app:create_app()'`` so the warm-up runs
+    before the worker accepts requests.
+    """
+    if warm:
+        warm_up()
+    start_workers()
+    return app
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
-    app.run(host="0.0.0.0", port=port)
+    create_app().run(host="0.0.0.0", port=port)
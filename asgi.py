@@ -0,0 +1,350 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from quart import Quart, Response
+from quart import request, jsonify, g
+
+import app as sync_app
+import async_http_client
+import locales
+import metrics
+from availability import AvailabilitySnapshot
+from circuit_breaker import CALENDLY_QUEUE_TIMEOUT
+from singleflight import AsyncSingleFlight
+
+# Async serving mode: same endpoints and JSON as app.py, run with
+#   hypercorn asgi:app
+# Caches and the availability snapshot are shared with the sync helpers.
+app = Quart(__name__)
+calendly_flight = AsyncSingleFlight()
+
+
+async def _acquire(breaker):
+    # The breaker is shared with the sync helpers' threads, so wait for a slot
+    # by polling rather than blocking the event loop
+    deadline = time.monotonic() + CALENDLY_QUEUE_TIMEOUT
+    while True:
+        admitted = breaker.try_acquire()
+        if admitted is not None:
+            return admitted
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.01)
+
+
+async def _request_window(tenant, key, start, end):
+    ticket = await _acquire(tenant.breaker)
+    if not ticket:
+        return None
+    url, headers, querystring = sync_app._window_request(tenant, start, end)
+    status_code = retry_after = None
+    try:
+        response = await async_http_client.get(url, upstream="calendly", headers=headers, params=querystring)
+        status_code, retry_after = response.status_code, response.headers.get("Retry-After")
+    except httpx.HTTPError as e:
+        print("❌ Calendly API error:", tenant.id, e)
+        return None
+    finally:
+        tenant.breaker.release(ticket, status_code, retry_after)
+    return sync_app._store_window(
+        tenant, key, response.is_success, response.status_code, response.text, response.json
+    )
+
+
+async def fetch_window(tenant, start, end, fresh=False):
+    key, now, slots = sync_app._cached_window(tenant, start, end, fresh)
+
+    if slots is None:
+        query_start = max(start, now + timedelta(seconds=30))
+        if query_start >= end:
+            return []
+        slots = await calendly_flight.do(
+            ("window", tenant.id) + key, _request_window, tenant, key, query_start, end
+        )
+        if slots is None:
+            return None
+
+    return sync_app._live_slots(slots, now)
+
+
+async def load_snapshot(tenant, days_ahead=30, fresh=False):
+    windows = sync_app._date_windows(days_ahead)
+    key = sync_app._snapshot_key(tenant, windows)
+    snapshot = None if fresh else tenant.snapshot_cache.get(key)
+    if snapshot is not None:
+        return snapshot
+    return await calendly_flight.do(("snapshot", tenant.id) + key, _build_snapshot, tenant, key, windows, fresh)
+
+
+async def _build_snapshot(tenant, key, windows, fresh):
+    results = await asyncio.gather(*(fetch_window(tenant, start, end, fresh) for start, end in windows))
+    return sync_app._snapshot_from_windows(tenant, key, windows, results)
+
+
+async def get_snapshot(tenant, days_ahead=30):
+    snapshot = sync_app._refreshed_snapshot(tenant, days_ahead)
+    if snapshot is not None:
+        return snapshot
+    return sync_app._or_last_snapshot(tenant, await load_snapshot(tenant, days_ahead))
+
+
+async def get_available_datess(tenant, limit=7, days_ahead=30, locale=locales.DEFAULT_LOCALE, snapshot=None):
+    if snapshot is None:
+        snapshot = await get_snapshot(tenant, days_ahead)
+    return sync_app._date_rows(snapshot.dates[:limit], locale)
+
+
+async def iter_available_dates(tenant, limit=7, days_ahead=30, locale=locales.DEFAULT_LOCALE):
+    windows = sync_app._date_windows(days_ahead)
+    tasks = [asyncio.ensure_future(fetch_window(tenant, start, end)) for start, end in windows]
+    now = datetime.now(timezone.utc)
+    sent, last = 0, ""
+    results = []
+    for (start, end), task in zip(windows, tasks):
+        try:
+            slots = await task
+        except Exception as e:
+            print("❌ Availability window failed:", tenant.id, e)
+            slots = None
+        results.append(slots)
+        if slots is None:
+            yield None
+            return
+        for d in sync_app._new_dates(slots, start, end, now, last):
+            yield sync_app._date_row(sent, d, locale)
+            sent, last = sent + 1, d
+            if sent == limit:
+                return
+    sync_app._snapshot_from_windows(tenant, sync_app._snapshot_key(tenant, windows), windows, results)
+
+
+async def _until_failed(first, rows):
+    yield first
+    async for row in rows:
+        if row is None:
+            return
+        yield row
+
+
+async def stream_available_dates(tenant, days_ahead=30, locale=locales.DEFAULT_LOCALE):
+    # See app.stream_available_dates
+    snapshot = await asyncio.to_thread(sync_app._cached_snapshot, tenant, days_ahead)
+    if snapshot is None:
+        rows = iter_available_dates(tenant, days_ahead=days_ahead, locale=locale)
+        first = await anext(rows, StopAsyncIteration)
+        if first is StopAsyncIteration:
+            return _rows([]), {}
+        if first is not None:
+            return _until_failed(first, rows), {}
+        if tenant.last_snapshot is None:
+            return _rows([]), {}
+        snapshot = tenant.last_snapshot.as_stale()
+    rows = await get_available_datess(tenant, locale=locale, snapshot=snapshot)
+    return _rows(rows), sync_app._stale_headers(snapshot)
+
+
+async def _encode_stream(rows, encode, closing):
+    async for row in rows:
+        yield encode(row)
+    if closing:
+        yield closing
+
+
+async def _rows(rows):
+    for row in rows:
+        yield row
+
+
+async def get_available_times_batch(tenant, dates, holder=None, snapshot=None):
+    if snapshot is None:
+        snapshot = await get_snapshot(tenant)
+    windows = sync_app._batch_windows(snapshot, dates)
+    results = await asyncio.gather(*(fetch_window(tenant, start, end) for start, end in windows))
+    return sync_app._batch_rows(tenant, snapshot, dates, windows, results, holder)
+
+
+async def get_available_timess(tenant, date, holder=None, snapshot=None):
+    if snapshot is None:
+        snapshot = await get_snapshot(tenant)
+
+    if not snapshot.covers(date):
+        try:
+            day_start, day_end = sync_app._local_day(date)
+        except ValueError as e:
+            print("❌ Calendly error:", str(e))
+            return []
+        slots = await fetch_window(tenant, day_start, day_end)
+        if slots is None:
+            return []
+        snapshot = AvailabilitySnapshot.from_slots(slots, day_start, day_end)
+
+    return sync_app._time_rows(sync_app._free_times(tenant, snapshot, date, holder))
+
+
+@app.before_serving
+async def start_sync_app():
+    # Warm-up and the outbox/webhook/refresher threads, as create_app() does for Flask
+    await asyncio.to_thread(sync_app.create_app)
+
+
+@app.after_serving
+async def close_upstream_client():
+    await async_http_client.aclose()
+
+
+# === Instrumentation ===
+
+@app.before_request
+async def start_request_timer():
+    g.route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    g.started = time.perf_counter()
+    metrics.HTTP_IN_FLIGHT.inc(g.route)
+
+
+@app.after_request
+async def record_request_metrics(response):
+    metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - g.started, g.route, request.method)
+    metrics.HTTP_RESPONSES.inc(g.route, request.method, str(response.status_code))
+    return response
+
+
+@app.teardown_request
+async def finish_request(exc):
+    if "route" in g:
+        metrics.HTTP_IN_FLIGHT.dec(g.route)
+
+
+@app.route("/metrics", methods=["GET"])
+async def api_metrics():
+    return metrics.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+
+# === REST API Endpoints ===
+
+@app.route("/available-dates", methods=["GET"])
+async def api_available_dates():
+    locale = request.args.get("locale", locales.DEFAULT_LOCALE)
+    if not locales.is_supported(locale):
+        return jsonify({"error": f"Unsupported locale '{locale}'"}), 400
+    tenant_id = request.args.get("tenant")
+    tenant = sync_app.tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+
+    stream = request.args.get("stream")
+    if stream is not None:
+        if stream not in sync_app.STREAM_FORMATS:
+            return jsonify({"error": f"Unsupported stream format '{stream}'"}), 400
+        mimetype, encode, closing = sync_app.STREAM_FORMATS[stream]
+        rows, headers = await stream_available_dates(tenant, locale=locale)
+        headers["Cache-Control"] = "no-cache"
+        return Response(_encode_stream(rows, encode, closing), mimetype=mimetype, headers=headers)
+
+    snapshot = await get_snapshot(tenant)
+    dates = await get_available_datess(tenant, locale=locale, snapshot=snapshot)
+    return jsonify(dates), 200, sync_app._stale_headers(snapshot)
+
+
+@app.route("/available-times", methods=["POST"])
+async def api_available_times():
+    data = await request.get_json()
+    date = data.get("date")
+    if not date:
+        return jsonify({"error": "Missing 'date'"}), 400
+    tenant_id = data.get("tenant")
+    tenant = sync_app.tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+    snapshot = await get_snapshot(tenant)
+    times = await get_available_timess(tenant, date, data.get("holder"), snapshot)
+    return jsonify(times), 200, sync_app._stale_headers(snapshot)
+
+
+@app.route("/available-times/batch", methods=["POST"])
+async def api_available_times_batch():
+    data = await request.get_json()
+    dates = data.get("dates")
+    if not dates or not isinstance(dates, list):
+        return jsonify({"error": "Missing 'dates'"}), 400
+    if len(dates) > sync_app.MAX_BATCH_DATES:
+        return jsonify({"error": f"At most {sync_app.MAX_BATCH_DATES} dates per request"}), 400
+    tenant_id = data.get("tenant")
+    tenant = sync_app.tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+
+    snapshot = await get_snapshot(tenant)
+    try:
+        times = await get_available_times_batch(tenant, dates, data.get("holder"), snapshot)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(times), 200, sync_app._stale_headers(snapshot)
+
+
+@app.route("/hold-slot", methods=["POST"])
+async def api_hold_slot():
+    data = await request.get_json()
+    date = data.get("date")
+    time = data.get("time")
+    holder = data.get("holder")
+    if not all([date, time, holder]):
+        return jsonify({"error": "Missing fields"}), 400
+    tenant_id = data.get("tenant")
+    tenant = sync_app.tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+
+    try:
+        sync_app._booking_start_iso(date, time)
+        held = sync_app.hold_slot(date, time, holder, tenant)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not held:
+        return jsonify({"error": "Slot is held by another customer"}), 409
+    return jsonify({"status": "held", "expires_in": sync_app.reservations.ttl}), 201
+
+
+@app.route("/create-booking", methods=["POST"])
+async def api_create_booking():
+    data = await request.get_json()
+    name = data.get("name")
+    email = data.get("email")
+    date = data.get("date")
+    time = data.get("time")
+
+    if not all([name, email, date, time]):
+        return jsonify({"error": "Missing fields"}), 400
+    tenant_id = data.get("tenant")
+    tenant = sync_app.tenant_registry.get(tenant_id)
+    if tenant is None:
+        return jsonify({"error": f"Unknown tenant '{tenant_id}'"}), 404
+
+    try:
+        date_time_iso = sync_app._booking_start_iso(date, time)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not sync_app.hold_slot(date, time, data.get("holder") or email, tenant, booked=True):
+        return jsonify({"error": "Slot is no longer available"}), 409
+
+    # The outbox insert is a short local write; delivery happens on its workers
+    result = await asyncio.to_thread(sync_app.queue_booking, name, email, date_time_iso, tenant)
+    return jsonify(result), 202
+
+
+@app.route("/calendly/webhook", methods=["POST"])
+async def calendly_webhook_receiver():
+    body, status = sync_app.handle_calendly_event(
+        request.headers.get("Calendly-Webhook-Signature"), await request.get_data()
+    )
+    return jsonify(body), status
+
+
+@app.route("/bookings/<booking_id>", methods=["GET"])
+async def api_booking_status(booking_id):
+    status = await asyncio.to_thread(sync_app.booking_outbox.status, booking_id)
+    if status is None:
+        return jsonify({"error": "Unknown booking_id"}), 404
+    return jsonify(status)
@@ -0,0 +1,56 @@
+import os
+import time
+
+import httpx
+
+import metrics
+from http_client import HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, upstream_name
+
+# --- Settings ---
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.environ.get("ASYNC_HTTP_MAX_CONNECTIONS", 200))
+
+TIMEOUT = httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+LIMITS = httpx.Limits(
+    max_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=HTTP_POOL_SIZE,
+)
+
+_client = None
+
+
+def client():
+    # Created on first use so it binds to the serving event loop
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=TIMEOUT, limits=LIMITS)
+    return _client
+
+
+async def aclose():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def request(method, url, upstream=None, **kwargs):
+    upstream = upstream or upstream_name(url)
+    metrics.UPSTREAM_IN_FLIGHT.inc(upstream)
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = await client().request(method, url, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.UPSTREAM_IN_FLIGHT.dec(upstream)
+        metrics.UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, upstream, method)
+        metrics.UPSTREAM_RESPONSES.inc(upstream, status)
+
+
+async def get(url, upstream=None, **kwargs):
+    return await request("GET", url, upstream, **kwargs)
+
+
+async def post(url, upstream=None, **kwargs):
+    return await request("POST", url, upstream, **kwargs)
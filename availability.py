@@ -0,0 +1,77 @@
+import time
+from array import array
+from bisect import bisect_left
+
+from slot_decoder import decode_slots, format_minute, local_timezone
+
+
+def _pack(by_date):
+    dates = tuple(sorted(by_date))
+    offsets = array("I", [0])
+    minutes = array("H")
+    for d in dates:
+        minutes.extend(sorted(by_date[d]))
+        offsets.append(len(minutes))
+    return dates, offsets, minutes
+
+
+class AvailabilitySnapshot:
+    """Calendly slots fetched once and indexed by local (Asia/Jerusalem) date.
+
+    Dates are kept in a sorted tuple; the slot times of all dates live in one
+    array of minutes-of-day, and ``_offsets[i]:_offsets[i + 1]`` is the slice
+    belonging to ``dates[i]``.
+    """
+
+    __slots__ = ("dates", "_offsets", "_minutes", "first_date", "last_date", "created_at", "complete", "stale")
+
+    def __init__(self, dates, offsets, minutes, first_date, last_date):
+        self.dates = dates
+        self._offsets = offsets
+        self._minutes = minutes
+        self.first_date = first_date
+        self.last_date = last_date
+        self.created_at = time.time()
+        self.complete = True
+        self.stale = False
+
+    @classmethod
+    def from_slots(cls, slots, start, end, tz="Asia/Jerusalem"):
+        local_tz = local_timezone(tz)
+        return cls(
+            *_pack(decode_slots(slots, tz)),
+            start.astimezone(local_tz).strftime("%Y-%m-%d"),
+            end.astimezone(local_tz).strftime("%Y-%m-%d"),
+        )
+
+    def as_stale(self):
+        """A copy sharing this snapshot's data, flagged as served past its freshness."""
+        copy = AvailabilitySnapshot(self.dates, self._offsets, self._minutes, self.first_date, self.last_date)
+        copy.created_at = self.created_at
+        copy.stale = True
+        return copy
+
+    def patched(self, other):
+        """A copy with the dates ``other`` covers replaced by its slots."""
+        by_date = {d: self.minutes(d) for d in self.dates if not other.covers(d)}
+        by_date.update((d, other.minutes(d)) for d in other.dates if other.covers(d) and self.covers(d))
+        copy = AvailabilitySnapshot(*_pack(by_date), self.first_date, self.last_date)
+        copy.created_at = self.created_at
+        copy.complete = self.complete
+        return copy
+
+    def covers(self, date):
+        # The last local day is only partly inside the fetched span
+        return self.first_date <= date < self.last_date
+
+    def minutes(self, date):
+        i = bisect_left(self.dates, date)
+        if i == len(self.dates) or self.dates[i] != date:
+            return self._minutes[:0]
+        return self._minutes[self._offsets[i]:self._offsets[i + 1]]
+
+    def times(self, date):
+        return [format_minute(m) for m in self.minutes(date)]
+
+    def __len__(self):
+        return len(self._minutes)
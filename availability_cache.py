@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# --- Settings ---
+AVAILABILITY_CACHE_TTL = float(os.environ.get("AVAILABILITY_CACHE_TTL", 60))
+AVAILABILITY_CACHE_SIZE = int(os.environ.get("AVAILABILITY_CACHE_SIZE", 256))
+
+
+class AvailabilityCache:
+    """LRU cache with a per-entry TTL for Calendly availability responses.
+
+    Keys are (event_type, window_start, window_end, timezone) tuples where the
+    window bounds are ISO-8601 strings, which is what invalidate_date() relies on.
+    """
+
+    def __init__(self, ttl=AVAILABILITY_CACHE_TTL, maxsize=AVAILABILITY_CACHE_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_date(self, date):
+        """Drop every window that may hold slots of the local date "YYYY-MM-DD"."""
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key[1][:10] <= date <= key[2][:10]
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,155 @@
+"""Benchmark: conversation messages per second, flow table vs the old if-chain.
+
+    python benchmarks/bench_flow.py [conversations]
+
+Every conversation walks main_menu -> choose_service -> ask_name ->
+choose_date -> choose_time -> confirm (six messages, the first one opening
+the session) through process_message. Availability comes from the local
+stand-ins and is cached after the warm-up, and outbound WhatsApp payloads are
+rendered but not sent, so the numbers are the bot's own per-message cost.
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from standins import StandInConfig, start_standins  # noqa: E402
+
+
+def legacy_process_message(bot, message):
+    # What process_message did before the flow table
+    phone_number = message["from"]
+    msg_type = message.get("type")
+
+    user = bot.data_store.get(phone_number)
+    if not user or user.last_step == "confirm":
+        bot.data_store.reset(phone_number)
+        bot.send_main_menu(phone_number)
+        return
+
+    if msg_type == "interactive":
+        selected_id = message["interactive"]["list_reply"]["id"]
+
+        if user.last_step == "main_menu":
+            if selected_id == "d1":
+                user.last_step = "choose_service"
+                bot.data_store.save(user)
+                bot.send_service_list(phone_number)
+            elif selected_id == "d2":
+                user.last_step = "choose_service"
+                bot.data_store.save(user)
+                bot.send_whatsapp_message(phone_number, "اوقات العمل ⏰ من 10 صباحًا إلى 8 مساءً")
+            elif selected_id == "d3":
+                user.last_step = "choose_service"
+                bot.data_store.save(user)
+                bot.send_whatsapp_message(phone_number, "تم تغيير اللغة. Language changed ✅")
+
+        elif user.last_step == "choose_service":
+            service_map = {
+                "1": "أكريلك",
+                "2": "جل",
+                "3": "تركيب أظافر"
+            }
+            user.service = service_map.get(selected_id, "غير معروف")
+            user.last_step = "ask_name"
+            bot.data_store.save(user)
+            bot.send_whatsapp_message(phone_number, "شو الاسم؟")
+
+        elif user.last_step == "choose_date":
+            user.date = selected_id
+            user.last_step = "choose_time"
+            bot.data_store.save(user)
+            bot.send_time_slots(phone_number, selected_id, bot.get_available_timess(selected_id, holder=phone_number))
+
+        elif user.last_step == "choose_time":
+            if not bot.hold_slot(user.date, selected_id, phone_number):
+                bot.send_whatsapp_message(phone_number, "هذا الموعد انحجز للتو، اختاري وقت ثاني")
+                bot.send_time_slots(phone_number, user.date, bot.get_available_timess(user.date, holder=phone_number))
+                return
+            user.time = selected_id
+            user.last_step = "confirm"
+            bot.data_store.save(user)
+            bot.send_confirmation(phone_number, user)
+
+    elif msg_type == "text":
+        if user.last_step == "ask_name":
+            user.name = message["text"]["body"]
+            user.last_step = "choose_date"
+            bot.data_store.save(user)
+            bot.send_date_slots(phone_number, bot.get_available_datess())
+
+
+def conversation(phone, date, time_):
+    def reply(selected_id):
+        return {"from": phone, "type": "interactive", "interactive": {"list_reply": {"id": selected_id}}}
+
+    return [
+        {"from": phone, "type": "text", "text": {"body": "مرحبا"}},
+        reply("d1"),
+        reply("1"),
+        {"from": phone, "type": "text", "text": {"body": "سارة"}},
+        reply(date),
+        reply(time_),
+    ]
+
+
+def best_of(process, messages, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for message in messages:
+            process(message)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [100, 1000, 10000]
+
+    standins, upstream = start_standins(StandInConfig(0))
+    workdir = tempfile.mkdtemp(prefix="bot-flow-")
+    # app.py reads its settings at import time
+    os.environ.update({
+        "CALENDLY_API_URL": upstream,
+        "CALENDLY_TOKEN": "bench",
+        "EVENT_TYPE_URL": f"{upstream}/event_types/bench",
+        "MAKE_WEBHOOK_URL": f"{upstream}/make-hook",
+        "META_API_URL": f"{upstream}/v17.0/100000000000000/messages",
+        "META_ACCESS_TOKEN": "bench",
+        "BOOKING_OUTBOX_PATH": os.path.join(workdir, "outbox.sqlite3"),
+        "SESSION_BACKEND": "memory",
+        "AVAILABILITY_CACHE_TTL": "3600",
+        # Every conversation takes the same slot; keep holds from turning them into conflicts
+        "RESERVATION_HOLD_SECONDS": "0",
+        "RESERVATION_BOOKED_SECONDS": "0",
+    })
+
+    import app as bot
+    import whatsapp
+
+    bot.create_app()
+    whatsapp.send_whatsapp_payload = lambda phone_number, payload: True
+
+    date = bot.get_available_datess()[0]["title"]
+    time_ = bot.get_available_timess(date)[0]["title"]
+
+    print(f"{'conversations':>13} {'if-chain msg/s':>15} {'table msg/s':>12} {'speedup':>8}")
+    for size in sizes:
+        messages = [
+            message
+            for i in range(size)
+            for message in conversation(f"9725{i:08d}", date, time_)
+        ]
+        old = best_of(lambda message: legacy_process_message(bot, message), messages)
+        new = best_of(bot.process_message, messages)
+        assert all(bot.data_store.get(m["from"]).last_step == "confirm" for m in messages[::6])
+        print(f"{size:>13} {len(messages) / old:>15.0f} {len(messages) / new:>12.0f} {old / new:>7.2f}x")
+
+    standins.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark: batched slot decoding vs per-slot datetime/pytz conversion.
+
+    python benchmarks/bench_slot_decoder.py [slots]
+
+Synthetic Calendly collections start every 5 minutes and cross the October
+Asia/Jerusalem DST change, so the per-day fallback path is exercised too.
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slot_decoder import decode_slots, format_minute  # noqa: E402
+
+
+def synthetic_collection(count, fractional=False):
+    start = datetime(2025, 10, 10, tzinfo=timezone.utc)
+    layout = "%Y-%m-%dT%H:%M:%S.000000Z" if fractional else "%Y-%m-%dT%H:%M:%SZ"
+    return [
+        {
+            "status": "available",
+            "invitees_remaining": 1,
+            "start_time": (start + timedelta(minutes=5 * i)).strftime(layout),
+        }
+        for i in range(count)
+    ]
+
+
+def per_slot(collection):
+    # What get_available_timess did for every slot before the batched decoder
+    jerusalem = pytz.timezone("Asia/Jerusalem")
+    by_date = {}
+    for slot in collection:
+        utc_time = datetime.fromisoformat(slot["start_time"].replace("Z", "+00:00"))
+        local_time = utc_time.astimezone(jerusalem)
+        by_date.setdefault(local_time.strftime("%Y-%m-%d"), set()).add(local_time.strftime("%H:%M"))
+    return by_date
+
+
+def batched(collection):
+    return {
+        d: {format_minute(m) for m in minutes}
+        for d, minutes in decode_slots(collection).items()
+    }
+
+
+def best_of(fn, collection, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(collection)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    sizes = [int(sys.argv[1])] if len(sys.argv) > 1 else [1000, 10000, 100000]
+    print(f"{'slots':>8} {'layout':>10} {'per-slot ms':>12} {'batched ms':>11} {'speedup':>8}")
+    for size in sizes:
+        for fractional in (False, True):
+            collection = synthetic_collection(size, fractional)
+            assert per_slot(collection) == batched(collection)
+            old = best_of(per_slot, collection) * 1000
+            new = best_of(batched, collection) * 1000
+            layout = "fraction" if fractional else "seconds"
+            print(f"{size:>8} {layout:>10} {old:>12.2f} {new:>11.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
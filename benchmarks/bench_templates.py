@@ -0,0 +1,142 @@
+"""Micro-benchmark: pre-serialised message templates vs building dicts per message.
+
+    python benchmarks/bench_templates.py [iterations]
+
+The dict path mirrors the original send_* helpers followed by the
+json.dumps(...).encode() that requests performs for ``json=payload``.
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import message_templates as templates  # noqa: E402
+
+PHONE = "972501234567"
+DATES = [
+    {"id": str(i + 1), "title": f"2025-07-{18 + i}", "description": "الجمعة"}
+    for i in range(7)
+]
+TIMES = [{"id": str(i + 1), "title": f"{10 + i}:00", "description": f"{10 + i}:00"} for i in range(10)]
+
+
+def dict_main_menu(phone_number):
+    return {
+        "messaging_product": "whatsapp",
+        "to": phone_number,
+        "type": "interactive",
+        "interactive": {
+            "type": "list",
+            "header": {"type": "text", "text": "هلا،كيفك؟ ✋"},
+            "body": {"text": "كيف ممكن أساعدك اليوم؟"},
+            "action": {
+                "button": "اختيار",
+                "sections": [{
+                    "title": "Available Options",
+                    "rows": [
+                        {"id": "d1", "title": "حجز دور 📅"},
+                        {"id": "d2", "title": "اوقات العمل ⏰"},
+                        {"id": "d3", "title": "تغيير لغه", "description": "Change language"}
+                    ]
+                }]
+            }
+        }
+    }
+
+
+def dict_date_slots(phone_number, dates):
+    return {
+        "messaging_product": "whatsapp",
+        "to": phone_number,
+        "type": "interactive",
+        "interactive": {
+            "type": "list",
+            "body": {"text": "اختاري التاريخ المناسب 📅"},
+            "action": {
+                "button": "تواريخ",
+                "sections": [{
+                    "title": "Available Dates",
+                    "rows": [
+                        {"id": d["title"], "title": d["title"], "description": d["description"]}
+                        for d in dates
+                    ]
+                }]
+            }
+        }
+    }
+
+
+def dict_time_slots(phone_number, times):
+    return {
+        "messaging_product": "whatsapp",
+        "to": phone_number,
+        "type": "interactive",
+        "interactive": {
+            "type": "list",
+            "body": {"text": "اختاري الوقت المناسب ⏰"},
+            "action": {
+                "button": "اوقات",
+                "sections": [{
+                    "title": "Available Times",
+                    "rows": [
+                        {"id": t["title"], "title": t["title"], "description": "الجمعة 18 يوليو"}
+                        for t in times
+                    ]
+                }]
+            }
+        }
+    }
+
+
+def template_date_slots(phone_number, dates):
+    rows = templates.DATE_ROWS.render((d["title"], d["title"], d["description"]) for d in dates)
+    return templates.DATE_SLOTS.render(to=phone_number, rows=rows)
+
+
+def template_time_slots(phone_number, times):
+    rows = templates.TIME_ROWS.render((t["title"], t["title"], "الجمعة 18 يوليو") for t in times)
+    return templates.TIME_SLOTS.render(to=phone_number, rows=rows)
+
+
+CASES = [
+    (
+        "main_menu",
+        lambda: json.dumps(dict_main_menu(PHONE)).encode(),
+        lambda: templates.MAIN_MENU.render(to=PHONE),
+    ),
+    (
+        "date_slots",
+        lambda: json.dumps(dict_date_slots(PHONE, DATES)).encode(),
+        lambda: template_date_slots(PHONE, DATES),
+    ),
+    (
+        "time_slots",
+        lambda: json.dumps(dict_time_slots(PHONE, TIMES)).encode(),
+        lambda: template_time_slots(PHONE, TIMES),
+    ),
+    (
+        "text",
+        lambda: json.dumps({
+            "messaging_product": "whatsapp", "to": PHONE, "type": "text", "text": {"body": "شو الاسم؟"}
+        }).encode(),
+        lambda: templates.TEXT.render(to=PHONE, body="شو الاسم؟"),
+    ),
+]
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"{'message':<12} {'dict us':>9} {'template us':>12} {'speedup':>8} {'bytes':>13}")
+    for name, dict_path, template_path in CASES:
+        # Both paths must produce the same message
+        assert json.loads(dict_path()) == json.loads(template_path()), name
+        dict_time = min(timeit.repeat(dict_path, number=number, repeat=3)) / number * 1e6
+        template_time = min(timeit.repeat(template_path, number=number, repeat=3)) / number * 1e6
+        size = f"{len(dict_path())}/{len(template_path())}"
+        print(f"{name:<12} {dict_time:>9.2f} {template_time:>12.2f} {dict_time / template_time:>7.1f}x {size:>13}")
+
+
+if __name__ == "__main__":
+    main()
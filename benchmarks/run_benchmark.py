@@ -0,0 +1,211 @@
+"""Offline throughput benchmark for the booking API and the WhatsApp webhook.
+
+    python benchmarks/run_benchmark.py --concurrency 32 --requests 1000 --latency-ms 120
+
+Starts the local stand-ins (benchmarks/standins.py) for Calendly, Make and Meta,
+points the app at them through CALENDLY_API_URL, MAKE_WEBHOOK_URL and
+META_API_URL, serves app.py on a local port and drives each scenario at the
+given concurrency. Reports p50/p95/p99 latency and requests per second;
+--json writes the report for CI and --max-p95-ms fails the run on a regression.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from standins import StandInConfig, start_standins  # noqa: E402
+
+SCENARIOS = ("available-dates", "available-times", "create-booking", "webhook")
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Driver:
+    def __init__(self, base_url, concurrency):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self._local = threading.local()
+
+    def session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def run(self, name, request_fn, total):
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+
+        def one(i):
+            nonlocal errors
+            started = time.perf_counter()
+            try:
+                ok = request_fn(self.session(), i)
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            list(pool.map(one, range(total)))
+        duration = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            "scenario": name,
+            "requests": total,
+            "errors": errors,
+            "concurrency": self.concurrency,
+            "duration_seconds": round(duration, 3),
+            "rps": round(total / duration, 1) if duration else None,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        }
+
+
+def webhook_message(phone, body):
+    message = dict({"from": phone, "id": f"wamid.{uuid.uuid4().hex}"}, **body)
+    return {"entry": [{"changes": [{"value": {"messages": [message]}}]}]}
+
+
+def build_scenarios(base_url, date, time_):
+    def available_dates(session, i):
+        return session.get(f"{base_url}/available-dates").ok
+
+    def available_times(session, i):
+        return session.post(f"{base_url}/available-times", json={"date": date}).ok
+
+    def create_booking(session, i):
+        payload = {"name": f"Bench {i}", "email": f"bench{i}@example.com", "date": date, "time": time_}
+        return session.post(f"{base_url}/create-booking", json=payload).ok
+
+    def webhook(session, i):
+        # One full conversation per request: greeting → menu → service → name → date → time
+        phone = f"97250{i:07d}"
+        steps = [
+            {"type": "text", "text": {"body": "hi"}},
+            {"type": "interactive", "interactive": {"type": "list_reply", "list_reply": {"id": "d1"}}},
+            {"type": "interactive", "interactive": {"type": "list_reply", "list_reply": {"id": "1"}}},
+            {"type": "text", "text": {"body": f"Bench {i}"}},
+            {"type": "interactive", "interactive": {"type": "list_reply", "list_reply": {"id": date}}},
+            {"type": "interactive", "interactive": {"type": "list_reply", "list_reply": {"id": time_}}},
+        ]
+        return all(session.post(f"{base_url}/webhook", json=webhook_message(phone, step)).ok for step in steps)
+
+    return {
+        "available-dates": available_dates,
+        "available-times": available_times,
+        "create-booking": create_booking,
+        "webhook": webhook,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=100, help="stand-in upstream latency")
+    parser.add_argument("--slots-per-day", type=int, default=16)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--no-cache", action="store_true", help="disable the availability cache")
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--max-p95-ms", type=float, help="exit 1 if any scenario's p95 is above this")
+    args = parser.parse_args()
+
+    config = StandInConfig(args.latency_ms, args.slots_per_day)
+    standins, upstream = start_standins(config)
+    workdir = tempfile.mkdtemp(prefix="bot-bench-")
+
+    # app.py reads its settings at import time
+    os.environ.update({
+        "CALENDLY_API_URL": upstream,
+        "CALENDLY_TOKEN": "bench",
+        "EVENT_TYPE_URL": f"{upstream}/event_types/bench",
+        "MAKE_WEBHOOK_URL": f"{upstream}/make-hook",
+        "META_API_URL": f"{upstream}/v17.0/100000000000000/messages",
+        "META_ACCESS_TOKEN": "bench",
+        "META_SEND_RATE": "100000",
+        "META_SEND_BURST": "100000",
+        "BOOKING_OUTBOX_PATH": os.path.join(workdir, "outbox.sqlite3"),
+        "SESSION_DB_PATH": os.path.join(workdir, "sessions.sqlite3"),
+        # Every request books the same slot; keep holds from turning them into 409s
+        "RESERVATION_HOLD_SECONDS": "0",
+        "RESERVATION_BOOKED_SECONDS": "0",
+    })
+    if args.no_cache:
+        os.environ["AVAILABILITY_CACHE_TTL"] = "0"
+
+    import app as bot
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, bot.create_app(), threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name="bench-app", daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    dates = requests.get(f"{base_url}/available-dates").json()
+    if not dates:
+        sys.exit("No dates returned by the app; check the stand-ins")
+    date = dates[0]["title"]
+    time_ = requests.post(f"{base_url}/available-times", json={"date": date}).json()[0]["title"]
+
+    driver = Driver(base_url, args.concurrency)
+    scenarios = build_scenarios(base_url, date, time_)
+    report = {"upstream_latency_ms": args.latency_ms, "cache": not args.no_cache, "results": []}
+
+    print(f"{'scenario':<16} {'req':>6} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name in args.scenarios.split(","):
+        before = dict(config.counts)
+        result = driver.run(name, scenarios[name], args.requests)
+        if name == "webhook":
+            # Acks are fast by design; also time how long the workers need to finish
+            drain_started = time.perf_counter()
+            bot.message_queue.join()
+            bot.whatsapp.sender.join()
+            result["drain_seconds"] = round(time.perf_counter() - drain_started, 3)
+        result["upstream_calls"] = {k: config.counts[k] - before[k] for k in config.counts}
+        report["results"].append(result)
+        print(
+            f"{name:<16} {result['requests']:>6} {result['errors']:>5} {result['rps']:>9} "
+            f"{result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9}"
+        )
+
+    server.shutdown()
+    standins.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.max_p95_ms is not None:
+        slow = [r["scenario"] for r in report["results"] if r["p95_ms"] > args.max_p95_ms]
+        if slow:
+            print(f"p95 above {args.max_p95_ms} ms: {', '.join(slow)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Local stand-ins for Calendly, the Make booking hook and the Meta messages API.
+
+    python benchmarks/standins.py --port 8900 --latency-ms 120 --slots-per-day 16
+
+Routes:
+    GET  /event_type_available_times   Calendly availability for start_time..end_time
+    POST /make-hook                    Make booking webhook
+    POST /<version>/<phone_id>/messages  Meta send message
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StandInConfig:
+    def __init__(self, latency_ms=100, slots_per_day=16, first_hour_utc=7, slot_minutes=30):
+        self.latency = latency_ms / 1000
+        self.slots_per_day = slots_per_day
+        self.first_hour_utc = first_hour_utc
+        self.slot_minutes = slot_minutes
+        # Set to e.g. 429 or 503 to make Calendly fail every request
+        self.calendly_status = None
+        self.retry_after = None
+        self.lock = threading.Lock()
+        self.counts = {"calendly": 0, "make": 0, "meta": 0}
+
+    def hit(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def calendly_slots(config, start, end):
+    # Every day except Saturday has slots_per_day slots from first_hour_utc on
+    slots = []
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        if day.weekday() != 5:
+            for i in range(config.slots_per_day):
+                slot = day + timedelta(hours=config.first_hour_utc, minutes=i * config.slot_minutes)
+                if start <= slot < end:
+                    slots.append({
+                        "status": "available",
+                        "invitees_remaining": 1,
+                        "start_time": slot.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        "scheduling_url": "https://calendly.com/stand-in",
+                    })
+        day += timedelta(days=1)
+    return slots
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/event_type_available_times":
+            return self._reply(404, {"title": "Resource Not Found"})
+        self.config.hit("calendly")
+        time.sleep(self.config.latency)
+        if self.config.calendly_status is not None:
+            headers = {"Retry-After": str(self.config.retry_after)} if self.config.retry_after is not None else None
+            return self._reply(self.config.calendly_status, {"title": "Stand-in failure"}, headers)
+        query = parse_qs(url.query)
+        try:
+            start = _parse_time(query["start_time"][0])
+            end = _parse_time(query["end_time"][0])
+        except (KeyError, ValueError):
+            return self._reply(400, {"title": "Invalid Argument"})
+        self._reply(200, {"collection": calendly_slots(self.config, start, end)})
+
+    def do_POST(self):
+        self._read_body()
+        path = urlparse(self.path).path
+        if path == "/make-hook":
+            self.config.hit("make")
+            time.sleep(self.config.latency)
+            return self._reply(200, {"accepted": True})
+        if path.endswith("/messages"):
+            self.config.hit("meta")
+            time.sleep(self.config.latency)
+            return self._reply(200, {"messaging_product": "whatsapp", "messages": [{"id": f"wamid.{uuid.uuid4().hex}"}]})
+        self._reply(404, {"error": "not found"})
+
+
+def start_standins(config, host="127.0.0.1", port=0):
+    """Serve the stand-ins in a background thread and return (server, base_url)."""
+    handler = type("ConfiguredStandInHandler", (StandInHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="standins", daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--slots-per-day", type=int, default=16)
+    args = parser.parse_args()
+
+    config = StandInConfig(args.latency_ms, args.slots_per_day)
+    server, base_url = start_standins(config, args.host, args.port)
+    print(f"Stand-ins listening on {base_url}")
+    print(f"  CALENDLY_API_URL={base_url}")
+    print(f"  MAKE_WEBHOOK_URL={base_url}/make-hook")
+    print(f"  META_API_URL={base_url}/v17.0/100000000000000/messages")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
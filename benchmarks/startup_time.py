@@ -0,0 +1,100 @@
+"""Cold start timing for app.py, with and without the warm-up.
+
+    python benchmarks/startup_time.py --latency-ms 150 --runs 3
+
+Each run starts a fresh interpreter against the local stand-ins
+(benchmarks/standins.py) and measures how long ``import app`` takes, how long
+``create_app()`` takes, and the latency of the first /available-dates and
+/available-times requests. The sum is what the first customer after a sleep
+waits for. --json writes the report for CI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from standins import StandInConfig, start_standins  # noqa: E402
+
+MODES = ("cold", "warm")
+
+
+def child(mode):
+    # Runs in the fresh interpreter; prints one JSON line with the timings
+    started = time.perf_counter()
+    import app as bot
+    imported = time.perf_counter()
+    flask_app = bot.create_app(warm=mode == "warm")
+    created = time.perf_counter()
+
+    client = flask_app.test_client()
+    dates = client.get("/available-dates").get_json()
+    first_dates = time.perf_counter()
+    client.post("/available-times", json={"date": dates[0]["title"]})
+    first_times = time.perf_counter()
+
+    print(json.dumps({
+        "mode": mode,
+        "import_ms": round((imported - started) * 1000, 1),
+        "create_app_ms": round((created - imported) * 1000, 1),
+        "first_dates_ms": round((first_dates - created) * 1000, 1),
+        "first_times_ms": round((first_times - first_dates) * 1000, 1),
+        "total_ms": round((first_times - started) * 1000, 1),
+    }))
+
+
+def run_once(mode, env):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=150, help="stand-in upstream latency")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.child)
+
+    standins, upstream = start_standins(StandInConfig(args.latency_ms))
+    workdir = tempfile.mkdtemp(prefix="bot-startup-")
+    env = dict(os.environ, **{
+        "CALENDLY_API_URL": upstream,
+        "CALENDLY_TOKEN": "bench",
+        "EVENT_TYPE_URL": f"{upstream}/event_types/bench",
+        "MAKE_WEBHOOK_URL": f"{upstream}/make-hook",
+        "META_API_URL": f"{upstream}/v17.0/100000000000000/messages",
+        "META_ACCESS_TOKEN": "bench",
+        "BOOKING_OUTBOX_PATH": os.path.join(workdir, "outbox.sqlite3"),
+        "SESSION_DB_PATH": os.path.join(workdir, "sessions.sqlite3"),
+    })
+
+    columns = ("import_ms", "create_app_ms", "first_dates_ms", "first_times_ms", "total_ms")
+    print(f"{'mode':<6} " + " ".join(f"{c:>15}" for c in columns))
+    report = {"upstream_latency_ms": args.latency_ms, "results": []}
+    for mode in MODES:
+        for _ in range(args.runs):
+            result = run_once(mode, env)
+            report["results"].append(result)
+            print(f"{mode:<6} " + " ".join(f"{result[c]:>15}" for c in columns))
+
+    standins.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import hashlib
+import hmac
+import json
+import os
+import time
+
+# --- Settings ---
+CALENDLY_WEBHOOK_SIGNING_KEY = os.environ.get("CALENDLY_WEBHOOK_SIGNING_KEY")
+CALENDLY_WEBHOOK_TOLERANCE_SECONDS = float(os.environ.get("CALENDLY_WEBHOOK_TOLERANCE_SECONDS", 180))
+
+EVENTS = ("invitee.created", "invitee.canceled")
+
+# The subscription itself is created once against the Calendly API:
+#   POST https://api.calendly.com/webhook_subscriptions
+#   {"url": "https://<host>/calendly/webhook", "events": ["invitee.created", "invitee.canceled"],
+#    "organization": "...", "scope": "organization", "signing_key": CALENDLY_WEBHOOK_SIGNING_KEY}
+
+
+def verify_signature(header, body, key=CALENDLY_WEBHOOK_SIGNING_KEY, tolerance=CALENDLY_WEBHOOK_TOLERANCE_SECONDS):
+    """Check a Calendly-Webhook-Signature header ("t=<unix>,v1=<hex>") against the raw body.
+
+    v1 is HMAC-SHA256 of "<t>.<body>" with the subscription's signing key;
+    old timestamps are refused so a captured request can't be replayed.
+    """
+    if not key or not header:
+        return False
+    parts = dict(item.split("=", 1) for item in header.split(",") if "=" in item)
+    timestamp, signature = parts.get("t"), parts.get("v1")
+    if not timestamp or not signature:
+        return False
+    try:
+        if abs(time.time() - int(timestamp)) > tolerance:
+            return False
+    except ValueError:
+        return False
+
+    expected = hmac.new(key.encode(), timestamp.encode() + b"." + body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def parse_event(body):
+    """(event, event_type_uri, start_time) for an invitee webhook, or None for anything else."""
+    try:
+        data = json.loads(body)
+        event = data["event"]
+        scheduled = data["payload"]["scheduled_event"]
+        return event, scheduled["event_type"], scheduled["start_time"]
+    except (ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+# --- Settings ---
+CALENDLY_BREAKER_FAILURES = int(os.environ.get("CALENDLY_BREAKER_FAILURES", 5))
+CALENDLY_BREAKER_RESET_SECONDS = float(os.environ.get("CALENDLY_BREAKER_RESET_SECONDS", 30))
+CALENDLY_QUEUE_TIMEOUT = float(os.environ.get("CALENDLY_QUEUE_TIMEOUT", 10))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Tickets handed out by acquire(); release() needs the one it got back
+ADMITTED = "admitted"
+PROBE = "probe"
+
+
+class CircuitBreaker:
+    """Fails Calendly calls fast while it is down or rate limiting us.
+
+    The circuit opens after ``failure_threshold`` consecutive failures (5xx or
+    no response) for ``reset_timeout`` seconds, and right away on a 429 for
+    its Retry-After. Once that passes one probe call is let through; its
+    success closes the circuit and a failure opens it again. Calls admitted
+    before the circuit opened may still finish meanwhile, but only the probe
+    decides.
+
+    It also caps concurrent calls with an AIMD limit: every success adds
+    1/limit (about one more call per round trip), every failure halves it,
+    between 1 and ``max_concurrency``.
+    """
+
+    def __init__(self, max_concurrency, failure_threshold=CALENDLY_BREAKER_FAILURES,
+                 reset_timeout=CALENDLY_BREAKER_RESET_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.limit = float(max_concurrency)
+        self.opened_count = 0
+        self.rejected = 0
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    def _admit(self, now):
+        if self.state == OPEN:
+            if now < self._open_until:
+                return False
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._probing:
+                return False
+            self._probing = True
+            self._in_flight += 1
+            return PROBE
+        if self._in_flight >= int(self.limit):
+            return None
+        self._in_flight += 1
+        return ADMITTED
+
+    def try_acquire(self):
+        """A ticket if the call may go ahead, False if the circuit is open, None if at the limit."""
+        with self._cond:
+            admitted = self._admit(time.monotonic())
+            if admitted is False:
+                self.rejected += 1
+            return admitted
+
+    def acquire(self, timeout=CALENDLY_QUEUE_TIMEOUT):
+        """Wait up to ``timeout`` for a slot under the limit; a ticket, or False if the call must not be made."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                admitted = self._admit(now)
+                if admitted is not None:
+                    if not admitted:
+                        self.rejected += 1
+                    return admitted
+                if now >= deadline:
+                    self.rejected += 1
+                    return False
+                self._cond.wait(deadline - now)
+
+    def release(self, ticket, status_code, retry_after=None):
+        """Record the outcome of the call admitted with ``ticket``; ``status_code`` is None if it raised."""
+        now = time.monotonic()
+        with self._cond:
+            self._in_flight -= 1
+            probe = ticket == PROBE
+            if probe:
+                self._probing = False
+            # While half-open only the probe may close or reopen the circuit
+            decides = probe or self.state != HALF_OPEN
+
+            if status_code == 429:
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = self.reset_timeout
+                self.limit = max(1.0, self.limit / 2)
+                if decides:
+                    self._open(now + delay)
+            elif status_code is None or status_code >= 500:
+                self._failures += 1
+                self.limit = max(1.0, self.limit / 2)
+                if decides and (probe or self._failures >= self.failure_threshold):
+                    self._open(now + self.reset_timeout)
+            else:
+                self._failures = 0
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                if probe and self.state == HALF_OPEN:
+                    self.state = CLOSED
+            self._cond.notify_all()
+
+    def _open(self, until):
+        if self.state != OPEN:
+            self.opened_count += 1
+        self.state = OPEN
+        self._open_until = max(self._open_until, until)
+
+    def status(self):
+        with self._cond:
+            return {
+                "state": self.state,
+                "concurrency_limit": int(self.limit),
+                "in_flight": self._in_flight,
+                "open_for_seconds": max(0.0, self._open_until - time.monotonic()) if self.state == OPEN else 0.0,
+                "opened_count": self.opened_count,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlite_local import LocalConnection
+
+# --- Settings ---
+WEBHOOK_DEDUP_WINDOW_SECONDS = float(os.environ.get("WEBHOOK_DEDUP_WINDOW_SECONDS", 24 * 3600))
+WEBHOOK_DEDUP_SIZE = int(os.environ.get("WEBHOOK_DEDUP_SIZE", 100000))
+WEBHOOK_DEDUP_DB = os.environ.get("WEBHOOK_DEDUP_DB")
+
+
+class MessageDeduplicator:
+    """Remembers WhatsApp message ids for a time window to drop redeliveries.
+
+    The in-memory index is an OrderedDict in first-seen order, bounded by
+    ``maxsize`` and ``window`` and trimmed from the front, so every check is
+    O(1). With ``path`` set, ids are also written to SQLite so replays are
+    caught across restarts and between worker processes.
+    """
+
+    def __init__(self, window=WEBHOOK_DEDUP_WINDOW_SECONDS, maxsize=WEBHOOK_DEDUP_SIZE, path=WEBHOOK_DEDUP_DB):
+        self.window = window
+        self.maxsize = maxsize
+        self.path = path
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = LocalConnection(path)
+        self._inserts = 0
+        self.checked = 0
+        self.duplicates = 0
+        if path:
+            self._conn().execute(
+                "CREATE TABLE IF NOT EXISTS message_ids (id TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+            )
+            self._conn().execute("CREATE INDEX IF NOT EXISTS message_ids_seen ON message_ids (seen_at)")
+
+    def seen(self, message_id):
+        """Record message_id and return True if it was already seen in the window."""
+        now = time.time()
+        with self._lock:
+            self.checked += 1
+            self._trim(now)
+            if message_id in self._seen:
+                self.duplicates += 1
+                return True
+            self._seen[message_id] = now
+
+        if self.path and not self._persist(message_id, now):
+            with self._lock:
+                self.duplicates += 1
+            return True
+        return False
+
+    def forget(self, message_id):
+        """Undo seen() for a message that could not be accepted after all."""
+        with self._lock:
+            self._seen.pop(message_id, None)
+        if self.path:
+            self._conn().execute("DELETE FROM message_ids WHERE id = ?", (message_id,))
+
+    def _persist(self, message_id, now):
+        # False when another process (or a previous run) already stored the id
+        conn = self._conn()
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO message_ids (id, seen_at) VALUES (?, ?)", (message_id, now)
+        )
+        if cursor.rowcount == 0:
+            row = conn.execute("SELECT seen_at FROM message_ids WHERE id = ?", (message_id,)).fetchone()
+            if row is not None and row[0] > now - self.window:
+                return False
+            conn.execute("UPDATE message_ids SET seen_at = ? WHERE id = ?", (now, message_id))
+        self._inserts += 1
+        if self._inserts % 1000 == 0:
+            conn.execute("DELETE FROM message_ids WHERE seen_at <= ?", (now - self.window,))
+        return True
+
+    def _trim(self, now):
+        cutoff = now - self.window
+        while self._seen:
+            oldest_id, seen_at = next(iter(self._seen.items()))
+            if seen_at > cutoff and len(self._seen) < self.maxsize:
+                break
+            del self._seen[oldest_id]
+
+    def stats(self):
+        return {
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "duplicate_rate": self.duplicates / self.checked if self.checked else 0.0,
+            "tracked": len(self._seen),
+        }
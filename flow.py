@@ -0,0 +1,78 @@
+ANY = "*"
+
+# How the value a transition matches on is read from each WhatsApp message type
+VALUES = {
+    "interactive": lambda message: message["interactive"]["list_reply"]["id"],
+    "text": lambda message: message["text"]["body"],
+}
+
+
+class Transition:
+    """One edge of the conversation: in ``state``, a ``msg_type`` message whose
+    value is ``match`` (or anything, for ANY) moves the session to ``next_step``.
+
+    ``update(user, value)`` fills the session first; returning False keeps the
+    current step. ``reply(user, value)`` runs after the session is saved.
+    """
+
+    __slots__ = ("state", "msg_type", "match", "next_step", "update", "reply")
+
+    def __init__(self, state, msg_type, match, next_step, update=None, reply=None):
+        self.state = state
+        self.msg_type = msg_type
+        self.match = match
+        self.next_step = next_step
+        self.update = update
+        self.reply = reply
+
+
+class Flow:
+    """A conversation defined as a table of Transitions.
+
+    Each transition is compiled once into a handler and indexed by
+    (state, msg_type, value), with ANY transitions under (state, msg_type), so
+    a message is dispatched with at most two dict lookups whatever the number
+    of steps. Messages no transition matches are ignored.
+    """
+
+    def __init__(self, transitions, save):
+        self._exact = {}
+        self._any = {}
+        for transition in transitions:
+            if transition.msg_type not in VALUES:
+                raise ValueError(f"Unsupported message type: {transition.msg_type}")
+            handler = self._compile(transition, save)
+            if transition.match == ANY:
+                key, table = (transition.state, transition.msg_type), self._any
+            else:
+                key, table = (transition.state, transition.msg_type, transition.match), self._exact
+            if key in table:
+                raise ValueError(f"Duplicate transition: {key}")
+            table[key] = handler
+
+    @staticmethod
+    def _compile(transition, save):
+        next_step, update, reply = transition.next_step, transition.update, transition.reply
+
+        def handler(user, value):
+            if update is not None and update(user, value) is False:
+                return
+            user.last_step = next_step
+            save(user)
+            if reply is not None:
+                reply(user, value)
+
+        return handler
+
+    def dispatch(self, user, message):
+        """Run the transition for ``message`` from the user's step; False if none matches."""
+        msg_type = message.get("type")
+        extract = VALUES.get(msg_type)
+        if extract is None:
+            return False
+        value = extract(message)
+        handler = self._exact.get((user.last_step, msg_type, value)) or self._any.get((user.last_step, msg_type))
+        if handler is None:
+            return False
+        handler(user, value)
+        return True
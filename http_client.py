@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import metrics
+
+# --- Settings ---
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", 10))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 3.05))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 15))
+
+TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def _build_session():
+    # requests is imported here, on first use, to keep it off the cold start path
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    # One pool per host (Calendly, Make, Meta), each keeping up to HTTP_POOL_SIZE
+    # keep-alive connections so repeated calls skip the TCP+TLS handshake.
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def preconnect(url):
+    """Open a keep-alive connection to the host of ``url`` so the first real call skips the handshake."""
+    parts = urlparse(url)
+    try:
+        get_session().head(f"{parts.scheme}://{parts.netloc}/", timeout=TIMEOUT)
+    except Exception as e:
+        print("⚠️ Preconnect failed:", parts.netloc, e)
+
+
+def upstream_name(url):
+    host = urlparse(url).hostname or ""
+    if host.endswith("calendly.com"):
+        return "calendly"
+    if host.endswith("make.com"):
+        return "make"
+    if host.endswith("facebook.com"):
+        return "meta"
+    return host
+
+
+def request(method, url, upstream=None, **kwargs):
+    kwargs.setdefault("timeout", TIMEOUT)
+    upstream = upstream or upstream_name(url)
+    metrics.UPSTREAM_IN_FLIGHT.inc(upstream)
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = get_session().request(method, url, **kwargs)
+        status = str(response.status_code)
+        return response
+    finally:
+        metrics.UPSTREAM_IN_FLIGHT.dec(upstream)
+        metrics.UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - started, upstream, method)
+        metrics.UPSTREAM_RESPONSES.inc(upstream, status)
+
+
+def get(url, upstream=None, **kwargs):
+    return request("GET", url, upstream, **kwargs)
+
+
+def post(url, upstream=None, **kwargs):
+    return request("POST", url, upstream, **kwargs)
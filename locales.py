@@ -0,0 +1,51 @@
+import os
+from datetime import date as date_cls
+from functools import lru_cache
+
+# --- Settings ---
+SUPPORTED_LOCALES = tuple(os.environ.get("SUPPORTED_LOCALES", "ar,he,en").split(","))
+DEFAULT_LOCALE = SUPPORTED_LOCALES[0]
+
+
+@lru_cache(maxsize=None)
+def _names(locale):
+    """(weekdays, months) of a locale: weekday names indexed like date.weekday()
+    (Monday=0) and month names indexed 1..12, as babel's "EEEE"/"MMMM" render them.
+
+    Built once per locale on first use, which is also when babel gets imported.
+    """
+    from babel.dates import get_day_names, get_month_names
+
+    weekdays = tuple(get_day_names("wide", locale=locale)[i] for i in range(7))
+    months = ("",) + tuple(get_month_names("wide", locale=locale)[i] for i in range(1, 13))
+    return weekdays, months
+
+
+def preload():
+    for locale in SUPPORTED_LOCALES:
+        _names(locale)
+
+
+def is_supported(locale):
+    return locale in SUPPORTED_LOCALES
+
+
+@lru_cache(maxsize=1024)
+def _parse(date):
+    return date_cls.fromisoformat(date)
+
+
+def weekday_name(date, locale=DEFAULT_LOCALE):
+    """Weekday name of a "YYYY-MM-DD" date, e.g. "الأحد"."""
+    return _names(locale)[0][_parse(date).weekday()]
+
+
+def month_name(date, locale=DEFAULT_LOCALE):
+    return _names(locale)[1][_parse(date).month]
+
+
+def date_label(date, locale=DEFAULT_LOCALE):
+    """Long label such as "الأحد 20 يوليو" for list headers and messages."""
+    day = _parse(date)
+    weekdays, months = _names(locale)
+    return f"{weekdays[day.weekday()]} {day.day} {months[day.month]}"
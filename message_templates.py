@@ -0,0 +1,155 @@
+import json
+import re
+from json.encoder import encode_basestring
+
+# A slot is written into the template payload as the string "@@name@@" and
+# replaced at render time by its JSON-encoded value.
+_SLOT = re.compile(r'"@@(\w+)@@"')
+
+
+def slot(name):
+    return f"@@{name}@@"
+
+
+class Raw(str):
+    """Already-encoded JSON, inserted into a template verbatim."""
+
+
+class MessageTemplate:
+    """A Meta message payload serialised once into JSON fragments.
+
+    render() only JSON-encodes the slot values and joins them with the
+    precompiled fragments, instead of building and serialising the whole
+    nested dict for every message.
+    """
+
+    def __init__(self, payload):
+        text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        parts = _SLOT.split(text)
+        self._fragments = parts[0::2]
+        self._slots = parts[1::2]
+
+    def render(self, **values):
+        out = [self._fragments[0]]
+        for name, fragment in zip(self._slots, self._fragments[1:]):
+            value = values[name]
+            out.append(value if isinstance(value, Raw) else encode_basestring(value))
+            out.append(fragment)
+        return "".join(out).encode()
+
+
+class RowsTemplate:
+    """Encodes list rows with a fixed key order, e.g. ("id", "title").
+
+    Everyone is offered the same dates and times until availability changes,
+    so encoded row lists are memoised by their content.
+    """
+
+    def __init__(self, keys, cache_size=256):
+        self.keys = keys
+        self.cache_size = cache_size
+        self._prefixes = [
+            ("{" if i == 0 else ",") + encode_basestring(key) + ":"
+            for i, key in enumerate(keys)
+        ]
+        self._cache = {}
+
+    def render(self, rows):
+        rows = tuple(rows)
+        encoded = self._cache.get(rows)
+        if encoded is None:
+            if len(self._cache) >= self.cache_size:
+                self._cache.clear()
+            encoded = self._cache[rows] = Raw("[" + ",".join(self._encode_row(row) for row in rows) + "]")
+        return encoded
+
+    def _encode_row(self, row):
+        return "".join([prefix + encode_basestring(value) for prefix, value in zip(self._prefixes, row)]) + "}"
+
+
+TEXT = MessageTemplate({
+    "messaging_product": "whatsapp",
+    "to": slot("to"),
+    "type": "text",
+    "text": {"body": slot("body")}
+})
+
+MAIN_MENU = MessageTemplate({
+    "messaging_product": "whatsapp",
+    "to": slot("to"),
+    "type": "interactive",
+    "interactive": {
+        "type": "list",
+        "header": {"type": "text", "text": "هلا،كيفك؟ ✋"},
+        "body": {"text": "كيف ممكن أساعدك اليوم؟"},
+        "action": {
+            "button": "اختيار",
+            "sections": [{
+                "title": "Available Options",
+                "rows": [
+                    {"id": "d1", "title": "حجز دور 📅"},
+                    {"id": "d2", "title": "اوقات العمل ⏰"},
+                    {"id": "d3", "title": "تغيير لغه", "description": "Change language"}
+                ]
+            }]
+        }
+    }
+})
+
+SERVICE_LIST = MessageTemplate({
+    "messaging_product": "whatsapp",
+    "to": slot("to"),
+    "type": "interactive",
+    "interactive": {
+        "type": "list",
+        "body": {"text": "شو حابة تعملي؟ 💅"},
+        "action": {
+            "button": "Select Date",
+            "sections": [{
+                "title": "Available Services",
+                "rows": [
+                    {"id": "1", "title": "💅 أكريلك (اكريل)", "description": "450"},
+                    {"id": "2", "title": "💅 جل", "description": "100"},
+                    {"id": "3", "title": "💅 تركيب أظافر", "description": "300"}
+                ]
+            }]
+        }
+    }
+})
+
+DATE_SLOTS = MessageTemplate({
+    "messaging_product": "whatsapp",
+    "to": slot("to"),
+    "type": "interactive",
+    "interactive": {
+        "type": "list",
+        "body": {"text": "اختاري التاريخ المناسب 📅"},
+        "action": {
+            "button": "تواريخ",
+            "sections": [{
+                "title": "Available Dates",
+                "rows": slot("rows")
+            }]
+        }
+    }
+})
+
+TIME_SLOTS = MessageTemplate({
+    "messaging_product": "whatsapp",
+    "to": slot("to"),
+    "type": "interactive",
+    "interactive": {
+        "type": "list",
+        "body": {"text": "اختاري الوقت المناسب ⏰"},
+        "action": {
+            "button": "اوقات",
+            "sections": [{
+                "title": "Available Times",
+                "rows": slot("rows")
+            }]
+        }
+    }
+})
+
+DATE_ROWS = RowsTemplate(("id", "title", "description"))
+TIME_ROWS = RowsTemplate(("id", "title", "description"))
@@ -0,0 +1,202 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+from sqlite_local import LocalConnection
+
+# --- Settings ---
+BOOKING_OUTBOX_PATH = os.environ.get("BOOKING_OUTBOX_PATH", "outbox.sqlite3")
+BOOKING_OUTBOX_WORKERS = int(os.environ.get("BOOKING_OUTBOX_WORKERS", 2))
+BOOKING_OUTBOX_BATCH = int(os.environ.get("BOOKING_OUTBOX_BATCH", 10))
+BOOKING_MAX_ATTEMPTS = int(os.environ.get("BOOKING_MAX_ATTEMPTS", 8))
+BOOKING_RETRY_BASE_SECONDS = float(os.environ.get("BOOKING_RETRY_BASE_SECONDS", 2))
+BOOKING_RETRY_MAX_SECONDS = float(os.environ.get("BOOKING_RETRY_MAX_SECONDS", 300))
+
+# A row left "delivering" longer than this (e.g. the process died) is picked up again.
+# The lease is renewed before each delivery, so it only has to outlast one Make call.
+LEASE_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookings (
+    id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_at REAL,
+    response_status INTEGER,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bookings_due ON bookings (status, next_attempt_at);
+"""
+
+
+class BookingOutbox:
+    """Durable SQLite outbox for bookings headed to the Make webhook.
+
+    ``deliver(booking_id, payload)`` is called from the worker threads and
+    returns ``(status_code, text)``. 2xx marks the booking delivered, other
+    4xx (except 408/429) fail it for good, anything else is retried with
+    exponential backoff until BOOKING_MAX_ATTEMPTS. The booking id doubles as
+    the idempotency key, so a retried delivery can be recognised downstream.
+    """
+
+    def __init__(self, deliver, path=BOOKING_OUTBOX_PATH, workers=BOOKING_OUTBOX_WORKERS,
+                 batch_size=BOOKING_OUTBOX_BATCH, max_attempts=BOOKING_MAX_ATTEMPTS):
+        self.deliver = deliver
+        self.path = path
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._conn = LocalConnection(path, row_factory=sqlite3.Row)
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._threads = []
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return _Transaction(self._conn())
+
+    def start(self):
+        for i in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._run, name=f"booking-outbox-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def enqueue(self, payload):
+        booking_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO bookings (id, payload, status, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, 'pending', ?, ?, ?)",
+                (booking_id, json.dumps(payload), now, now, now),
+            )
+        self._wake.set()
+        return booking_id
+
+    def status(self, booking_id):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, status, attempts, response_status, last_error, created_at, updated_at "
+                "FROM bookings WHERE id = ?",
+                (booking_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "booking_id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "response_status": row["response_status"],
+            "last_error": row["last_error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def counts(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM bookings GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def claim_batch(self):
+        now = time.time()
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE makes the claim exclusive across worker processes
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, payload, attempts FROM bookings "
+                "WHERE (status = 'pending' AND next_attempt_at <= ?) "
+                "OR (status = 'delivering' AND claimed_at < ?) "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (now, now - LEASE_SECONDS, self.batch_size),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE bookings SET status = 'delivering', claimed_at = ?, updated_at = ? WHERE id = ?",
+                [(now, now, row["id"]) for row in rows],
+            )
+        return now, rows
+
+    def _renew(self, booking_id, claimed_at):
+        """Restart the lease on a row this worker claimed at ``claimed_at``; None if another took it over."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE bookings SET claimed_at = ? WHERE id = ? AND status = 'delivering' AND claimed_at = ?",
+                (now, booking_id, claimed_at),
+            )
+        return now if cursor.rowcount else None
+
+    def drain_once(self):
+        claimed_at, rows = self.claim_batch()
+        for row in rows:
+            # The rows ahead of this one may have used up the lease taken for the batch
+            lease = self._renew(row["id"], claimed_at)
+            if lease is None:
+                continue
+            attempts = row["attempts"] + 1
+            try:
+                status_code, text = self.deliver(row["id"], json.loads(row["payload"]))
+            except Exception as e:
+                status_code, text = None, str(e)
+            # Recorded right away: a delivered row must not sit in "delivering" until its lease runs out
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE bookings SET status = ?, attempts = ?, next_attempt_at = ?, claimed_at = NULL, "
+                    "response_status = ?, last_error = ?, updated_at = ? WHERE id = ? AND claimed_at = ?",
+                    self._outcome(row["id"], attempts, status_code, text) + (lease,),
+                )
+        return len(rows)
+
+    def _outcome(self, booking_id, attempts, status_code, text):
+        now = time.time()
+        if status_code is not None and 200 <= status_code < 300:
+            return "delivered", attempts, now, status_code, None, now, booking_id
+
+        retryable = status_code is None or status_code >= 500 or status_code in (408, 429)
+        if not retryable or attempts >= self.max_attempts:
+            print("❌ Booking failed:", booking_id, status_code, text)
+            return "failed", attempts, now, status_code, text, now, booking_id
+
+        delay = min(BOOKING_RETRY_BASE_SECONDS * 2 ** (attempts - 1), BOOKING_RETRY_MAX_SECONDS)
+        delay *= random.uniform(0.8, 1.2)
+        return "pending", attempts, now + delay, status_code, text, now, booking_id
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                if self.drain_once():
+                    continue
+            except sqlite3.Error as e:
+                print("❌ Booking outbox error:", e)
+            self._wake.wait(1)
+            self._wake.clear()
+
+
+class _Transaction:
+    """Commits (or rolls back) an explicit BEGIN when the block exits."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.conn.in_transaction:
+            if exc_type is None:
+                self.conn.execute("COMMIT")
+            else:
+                self.conn.execute("ROLLBACK")
+        return False
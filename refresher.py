@@ -0,0 +1,113 @@
+import threading
+import time
+
+
+class AvailabilityRefresher:
+    """Rebuilds the availability snapshot on a fixed interval in a daemon thread.
+
+    Readers always get the last good snapshot right away; refresh() swaps in a
+    new one only after it has been fully loaded. patch() never waits for a
+    running refresh: it patches the current snapshot and is replayed onto the
+    refresh's result, so a pool worker patching can't hold up the windows the
+    refresh is waiting on.
+    """
+
+    def __init__(self, load, interval, days_ahead):
+        self.load = load
+        self.interval = interval
+        self.days_ahead = days_ahead
+        self.snapshot = None
+        self.last_refresh_at = None
+        self.last_duration = None
+        self.last_error = None
+        self.refresh_count = 0
+        self.patch_count = 0
+        self._refreshing = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="availability-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def trigger(self):
+        """Ask the worker to refresh now instead of waiting for the interval."""
+        self._wake.set()
+
+    def refresh(self):
+        # Concurrent triggers collapse into the refresh already running
+        if not self._refreshing.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                self._pending = []
+            started = time.monotonic()
+            try:
+                snapshot = self.load(self.days_ahead, fresh=True)
+            except Exception as e:
+                self.last_error = str(e)
+                print("❌ Availability refresh failed:", e)
+                return False
+            with self._lock:
+                if not snapshot.complete:
+                    # Keep serving the last good data over a partial fetch. With none yet,
+                    # requests load (and fall back) themselves rather than get it as fresh.
+                    self.last_error = "incomplete availability fetch"
+                    return False
+                # Days patched while this refresh was loading are newer than its windows
+                for day in self._pending:
+                    snapshot = snapshot.patched(day)
+                self.snapshot = snapshot
+            self.last_error = None
+            self.last_refresh_at = time.time()
+            self.last_duration = time.monotonic() - started
+            self.refresh_count += 1
+            return True
+        finally:
+            with self._lock:
+                self._pending = None
+            self._refreshing.release()
+
+    def patch(self, snapshot):
+        """Merge freshly fetched availability for part of the horizon (e.g. one day)."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(snapshot)
+            if self.snapshot is None:
+                return self._pending is not None
+            self.snapshot = self.snapshot.patched(snapshot)
+            self.patch_count += 1
+            return True
+
+    def status(self):
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval_seconds": self.interval,
+            "days_ahead": self.days_ahead,
+            "last_refresh_at": self.last_refresh_at,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+            "refresh_count": self.refresh_count,
+            "patch_count": self.patch_count,
+            "snapshot_age_seconds": (
+                time.time() - self.snapshot.created_at if self.snapshot is not None else None
+            ),
+        }
+
+    def _run(self):
+        # A snapshot loaded before start() (by the warm-up) counts as the first refresh
+        if self.snapshot is not None:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+        while not self._stopped.is_set():
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
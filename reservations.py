@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+# --- Settings ---
+RESERVATION_HOLD_SECONDS = float(os.environ.get("RESERVATION_HOLD_SECONDS", 300))
+RESERVATION_BOOKED_SECONDS = float(os.environ.get("RESERVATION_BOOKED_SECONDS", 1800))
+SLOT_DURATION_MINUTES = int(os.environ.get("SLOT_DURATION_MINUTES", 30))
+
+
+class Hold:
+    __slots__ = ("start", "end", "holder", "expires_at", "booked")
+
+    def __init__(self, start, end, holder, expires_at, booked):
+        self.start = start
+        self.end = end
+        self.holder = holder
+        self.expires_at = expires_at
+        self.booked = booked
+
+
+class ReservationLedger:
+    """Short-lived local holds on slots so two customers can't take the same one.
+
+    Holds are kept per (tenant, local date) as a list of start minutes sorted
+    for bisect plus the matching Hold records. Holds of one day never overlap
+    and all last ``duration`` minutes, so only the holds starting within
+    ``duration`` of a slot can conflict with it and every lookup is
+    O(log n). Expired holds are dropped as they are found and by a periodic
+    sweep.
+    """
+
+    def __init__(self, ttl=RESERVATION_HOLD_SECONDS, booked_ttl=RESERVATION_BOOKED_SECONDS,
+                 duration=SLOT_DURATION_MINUTES):
+        self.ttl = ttl
+        self.booked_ttl = booked_ttl
+        self.duration = duration
+        self._days = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + ttl
+        self.placed = 0
+        self.conflicts = 0
+
+    def _overlapping(self, day, minute, now):
+        # Starts in (minute - duration, minute + duration) are the only candidates
+        starts, holds = day
+        lo = bisect_right(starts, minute - self.duration)
+        hi = bisect_left(starts, minute + self.duration)
+        for i in range(hi - 1, lo - 1, -1):
+            if holds[i].expires_at <= now:
+                del starts[i], holds[i]
+        lo = bisect_right(starts, minute - self.duration)
+        hi = bisect_left(starts, minute + self.duration)
+        return lo, hi
+
+    def hold(self, tenant_id, date, minute, holder, booked=False):
+        """Hold the slot for ``holder``; False if someone else holds an overlapping slot.
+
+        A customer's new hold replaces their own overlapping ones, except a
+        booked slot, which is never taken twice.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            day = self._days.setdefault((tenant_id, date), ([], []))
+            starts, holds = day
+            lo, hi = self._overlapping(day, minute, now)
+            if any(h.holder != holder or h.booked for h in holds[lo:hi]):
+                self.conflicts += 1
+                return False
+            del starts[lo:hi], holds[lo:hi]
+
+            ttl = self.booked_ttl if booked else self.ttl
+            i = bisect_left(starts, minute)
+            starts.insert(i, minute)
+            holds.insert(i, Hold(minute, minute + self.duration, holder, now + ttl, booked))
+            self.placed += 1
+            return True
+
+    def release(self, tenant_id, date, minute, holder):
+        with self._lock:
+            day = self._days.get((tenant_id, date))
+            if day is None:
+                return False
+            starts, holds = day
+            i = bisect_left(starts, minute)
+            if i < len(starts) and starts[i] == minute and holds[i].holder == holder and not holds[i].booked:
+                del starts[i], holds[i]
+                return True
+            return False
+
+    def free(self, tenant_id, date, minutes, holder=None):
+        """The sorted ``minutes`` that no other customer holds."""
+        now = time.monotonic()
+        with self._lock:
+            day = self._days.get((tenant_id, date))
+            if day is None or not day[0]:
+                return list(minutes)
+            starts, holds = day
+            result = []
+            for minute in minutes:
+                lo = bisect_right(starts, minute - self.duration)
+                hi = bisect_left(starts, minute + self.duration)
+                if not any(
+                    h.expires_at > now and (h.holder != holder or h.booked) for h in holds[lo:hi]
+                ):
+                    result.append(minute)
+            return result
+
+    def _sweep(self, now):
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.ttl
+        for key in list(self._days):
+            starts, holds = self._days[key]
+            live = [i for i, h in enumerate(holds) if h.expires_at > now]
+            if not live:
+                del self._days[key]
+            elif len(live) < len(holds):
+                self._days[key] = ([starts[i] for i in live], [holds[i] for i in live])
+
+    def stats(self):
+        with self._lock:
+            return {
+                "holds": sum(len(starts) for starts, _ in self._days.values()),
+                "placed": self.placed,
+                "conflicts": self.conflicts,
+            }
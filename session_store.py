@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from sqlite_local import LocalConnection
+
+# --- Settings ---
+SESSION_TIMEOUT_MINUTES = float(os.environ.get("SESSION_TIMEOUT_MINUTES", 15))
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "memory")
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", "sessions.sqlite3")
+
+FIELDS = ("last_step", "service", "name", "date", "time")
+
+
+class Session:
+    __slots__ = ("phone_number", "last_step", "service", "name", "date", "time", "last_interaction_time")
+
+    def __init__(self, phone_number, last_step="main_menu", service=None, name=None, date=None, time=None,
+                 last_interaction_time=None):
+        self.phone_number = phone_number
+        self.last_step = last_step
+        self.service = service
+        self.name = name
+        self.date = date
+        self.time = time
+        self.last_interaction_time = last_interaction_time
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class SessionStore(ABC):
+    """Conversation state per phone number, expiring after ``ttl`` seconds idle.
+
+    get() never returns an expired session; save() stamps the interaction time.
+    """
+
+    def __init__(self, ttl=SESSION_TIMEOUT_MINUTES * 60):
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, phone_number):
+        pass
+
+    @abstractmethod
+    def save(self, session):
+        pass
+
+    @abstractmethod
+    def delete(self, phone_number):
+        pass
+
+    @abstractmethod
+    def evict_expired(self):
+        pass
+
+    @abstractmethod
+    def __len__(self):
+        pass
+
+    def reset(self, phone_number):
+        session = Session(phone_number)
+        self.save(session)
+        return session
+
+
+class MemorySessionStore(SessionStore):
+    # The OrderedDict doubles as the expiry index: save() moves a session to the
+    # end, so the oldest interaction is always first and eviction stops at the
+    # first live entry.
+
+    def __init__(self, ttl=SESSION_TIMEOUT_MINUTES * 60):
+        super().__init__(ttl)
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, phone_number):
+        with self._lock:
+            self._evict(time.time())
+            return self._sessions.get(phone_number)
+
+    def save(self, session):
+        now = time.time()
+        session.last_interaction_time = now
+        with self._lock:
+            self._sessions[session.phone_number] = session
+            self._sessions.move_to_end(session.phone_number)
+            self._evict(now)
+
+    def delete(self, phone_number):
+        with self._lock:
+            self._sessions.pop(phone_number, None)
+
+    def evict_expired(self):
+        with self._lock:
+            return self._evict(time.time())
+
+    def _evict(self, now):
+        cutoff = now - self.ttl
+        evicted = 0
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_interaction_time > cutoff:
+                break
+            self._sessions.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    # Shared by every worker process on the host; memory stays bounded because
+    # rows live on disk and expired ones are deleted through the time index.
+
+    def __init__(self, path=SESSION_DB_PATH, ttl=SESSION_TIMEOUT_MINUTES * 60):
+        super().__init__(ttl)
+        self.path = path
+        self._conn = LocalConnection(path)
+        self._saves = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "phone_number TEXT PRIMARY KEY, last_step TEXT, service TEXT, name TEXT, date TEXT, time TEXT, "
+            "last_interaction_time REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_expiry ON sessions (last_interaction_time)")
+
+    def get(self, phone_number):
+        row = self._conn().execute(
+            "SELECT last_step, service, name, date, time, last_interaction_time FROM sessions "
+            "WHERE phone_number = ? AND last_interaction_time > ?",
+            (phone_number, time.time() - self.ttl),
+        ).fetchone()
+        if row is None:
+            return None
+        return Session(phone_number, *row)
+
+    def save(self, session):
+        session.last_interaction_time = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO sessions (phone_number, last_step, service, name, date, time, "
+            "last_interaction_time) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (session.phone_number, *(getattr(session, field) for field in FIELDS), session.last_interaction_time),
+        )
+        self._saves += 1
+        if self._saves % 100 == 0:
+            self.evict_expired()
+
+    def delete(self, phone_number):
+        self._conn().execute("DELETE FROM sessions WHERE phone_number = ?", (phone_number,))
+
+    def evict_expired(self):
+        cursor = self._conn().execute(
+            "DELETE FROM sessions WHERE last_interaction_time <= ?", (time.time() - self.ttl,)
+        )
+        return cursor.rowcount
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def make_session_store(backend=SESSION_BACKEND):
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
@@ -0,0 +1,95 @@
+from datetime import date as date_cls
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def local_timezone(tz):
+    # pytz is imported here, on first use, to keep it off the cold start path
+    import pytz
+    return pytz.timezone(tz)
+
+
+@lru_cache(maxsize=4096)
+def _day_offsets(tz, utc_date):
+    """UTC offset in minutes for a UTC date, or None when it changes that day."""
+    local_tz = local_timezone(tz)
+    day = datetime.strptime(utc_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    first = day.astimezone(local_tz).utcoffset()
+    last = (day + timedelta(hours=23, minutes=59)).astimezone(local_tz).utcoffset()
+    if first != last:
+        return None
+    return int(first.total_seconds()) // 60
+
+
+@lru_cache(maxsize=4096)
+def _shift_date(utc_date, days):
+    return (date_cls.fromisoformat(utc_date) + timedelta(days=days)).isoformat()
+
+
+def decode_slots(collection, tz="Asia/Jerusalem"):
+    """Group Calendly slots by local date as {"YYYY-MM-DD": {minute_of_day, ...}}.
+
+    Calendly start times have a fixed layout ("2025-07-18T07:30:00Z", with
+    optional fractional seconds), so the date, hour and minute are sliced out
+    directly and shifted by one UTC offset looked up per day. Only days with
+    a DST change fall back to a full per-slot pytz conversion.
+    """
+    by_date = {}
+    local_tz = None
+
+    for slot in collection:
+        start = slot.get("start_time")
+        if not start:
+            continue  # Skip empty or malformed slot
+
+        utc_date = start[:10]
+        offset = _day_offsets(tz, utc_date)
+        if offset is None:
+            if local_tz is None:
+                local_tz = local_timezone(tz)
+            local_time = datetime.fromisoformat(start.replace("Z", "+00:00")).astimezone(local_tz)
+            local_date = local_time.strftime("%Y-%m-%d")
+            minute = local_time.hour * 60 + local_time.minute
+        else:
+            minute = int(start[11:13]) * 60 + int(start[14:16]) + offset
+            if minute >= 1440:
+                local_date = _shift_date(utc_date, 1)
+                minute -= 1440
+            elif minute < 0:
+                local_date = _shift_date(utc_date, -1)
+                minute += 1440
+            else:
+                local_date = utc_date
+
+        minutes = by_date.get(local_date)
+        if minutes is None:
+            minutes = by_date[local_date] = set()
+        minutes.add(minute)
+
+    return by_date
+
+
+def format_minute(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def parse_minute(time):
+    """Minute of day for a local "HH:MM" time; ValueError if malformed."""
+    try:
+        hours, minutes = time.split(":")
+        minute = int(hours) * 60 + int(minutes)
+    except ValueError:
+        minute = -1
+    if not 0 <= minute < 24 * 60:
+        raise ValueError(f"Invalid time '{time}'")
+    return minute
+
+
+def decode_times(collection, tz="Asia/Jerusalem"):
+    """Sorted local "HH:MM" times of every slot in the collection."""
+    return sorted(
+        format_minute(minute)
+        for minutes in decode_slots(collection, tz).values()
+        for minute in minutes
+    )
@@ -0,0 +1,27 @@
+import sqlite3
+import threading
+
+
+class LocalConnection:
+    """Calling it returns this thread's SQLite connection to ``path``, opened on first use.
+
+    Connections are in WAL mode with synchronous=NORMAL so readers never
+    block the writer, and in autocommit mode: callers BEGIN explicitly when
+    several statements have to commit together.
+    """
+
+    def __init__(self, path, row_factory=None):
+        self.path = path
+        self.row_factory = row_factory
+        self._local = threading.local()
+
+    def __call__(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            self._local.conn = conn
+        return conn
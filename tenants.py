@@ -0,0 +1,94 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from availability_cache import AvailabilityCache
+from circuit_breaker import CircuitBreaker
+
+# --- Settings ---
+TENANTS_FILE = os.environ.get("TENANTS_FILE")
+DEFAULT_TENANT = os.environ.get("DEFAULT_TENANT", "default")
+CALENDLY_MAX_WORKERS = int(os.environ.get("CALENDLY_MAX_WORKERS", 5))
+
+
+class Tenant:
+    """One Calendly event type with its own caches and upstream budget.
+
+    ``breaker`` caps the tenant's concurrent Calendly calls (and stops them
+    while Calendly is failing) and ``pool`` runs its snapshot windows, so a
+    slow or busy calendar cannot starve the others. ``last_snapshot`` is the
+    last complete availability, served as stale while Calendly is unreachable.
+    """
+
+    def __init__(self, tenant_id, calendly_token, event_type_url, max_concurrency=CALENDLY_MAX_WORKERS):
+        self.id = tenant_id
+        self.calendly_token = calendly_token
+        self.event_type_url = event_type_url
+        self.max_concurrency = max_concurrency
+        self.availability_cache = AvailabilityCache()
+        self.snapshot_cache = AvailabilityCache(maxsize=8)
+        self.breaker = CircuitBreaker(max_concurrency)
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix=f"calendly-{tenant_id}")
+        self.refresher = None
+        self.last_snapshot = None
+
+    def status(self):
+        return {
+            "event_type": self.event_type_url,
+            "max_concurrency": self.max_concurrency,
+            "cached_windows": len(self.availability_cache),
+            "cached_snapshots": len(self.snapshot_cache),
+            "circuit": self.breaker.status(),
+            "refresher": self.refresher.status() if self.refresher is not None else None,
+        }
+
+
+class TenantRegistry:
+    def __init__(self, tenants, default_id=DEFAULT_TENANT):
+        self._tenants = {tenant.id: tenant for tenant in tenants}
+        self._by_event_type = {tenant.event_type_url: tenant for tenant in tenants}
+        self.default = self._tenants[default_id]
+
+    def get(self, tenant_id=None):
+        """Return the tenant for ``tenant_id`` (the default one for None), or None if unknown."""
+        if tenant_id is None:
+            return self.default
+        return self._tenants.get(tenant_id)
+
+    def for_event_type(self, event_type_url):
+        return self._by_event_type.get(event_type_url)
+
+    def __iter__(self):
+        return iter(self._tenants.values())
+
+    def __len__(self):
+        return len(self._tenants)
+
+
+def load_registry(calendly_token, event_type_url, path=TENANTS_FILE):
+    """Build the registry from TENANTS_FILE plus the default tenant from the environment.
+
+    TENANTS_FILE is a JSON object keyed by tenant id:
+
+        {"gel": {"event_type_url": "https://api.calendly.com/event_types/...",
+                 "calendly_token": "...", "max_concurrency": 3}}
+
+    calendly_token and max_concurrency are optional and fall back to
+    CALENDLY_TOKEN and CALENDLY_MAX_WORKERS. An entry named DEFAULT_TENANT
+    replaces the one built from CALENDLY_TOKEN and EVENT_TYPE_URL.
+    """
+    config = {DEFAULT_TENANT: {"event_type_url": event_type_url}}
+    if path:
+        with open(path) as f:
+            config.update(json.load(f))
+
+    tenants = [
+        Tenant(
+            tenant_id,
+            entry.get("calendly_token", calendly_token),
+            entry["event_type_url"],
+            int(entry.get("max_concurrency", CALENDLY_MAX_WORKERS)),
+        )
+        for tenant_id, entry in config.items()
+    ]
+    return TenantRegistry(tenants)
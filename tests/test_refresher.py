@@ -0,0 +1,63 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from availability import AvailabilitySnapshot  # noqa: E402
+from refresher import AvailabilityRefresher  # noqa: E402
+
+START = datetime(2030, 1, 1, tzinfo=timezone.utc)
+END = START + timedelta(days=7)
+
+
+def slots(*starts):
+    return [{"status": "available", "start_time": start} for start in starts]
+
+
+def test_patch_from_the_pool_does_not_deadlock_a_running_refresh():
+    # A pool with one worker (a tenant with max_concurrency=1): the refresh
+    # waits on a window queued behind the patch that _invalidate_date submitted
+    pool = ThreadPoolExecutor(max_workers=1)
+    loading = threading.Event()
+    patch_queued = threading.Event()
+
+    def load(days_ahead, fresh=False):
+        loading.set()
+        patch_queued.wait(5)
+        window = pool.submit(slots, "2030-01-02T08:00:00Z", "2030-01-03T08:00:00Z")
+        return AvailabilitySnapshot.from_slots(window.result(timeout=5), START, END)
+
+    refresher = AvailabilityRefresher(load, interval=60, days_ahead=7)
+    refresher.snapshot = AvailabilitySnapshot.from_slots([], START, END)
+    refreshing = threading.Thread(target=refresher.refresh)
+    refreshing.start()
+    assert loading.wait(5)
+
+    day_start = datetime(2030, 1, 2, tzinfo=timezone.utc) - timedelta(hours=2)
+    day = AvailabilitySnapshot.from_slots(slots("2030-01-02T09:00:00Z"), day_start, day_start + timedelta(days=1))
+    patched = pool.submit(refresher.patch, day)
+    patch_queued.set()
+
+    assert patched.result(timeout=5) is True
+    refreshing.join(5)
+    assert not refreshing.is_alive()
+    assert refresher.refresh_count == 1
+    # The patch is newer than the refresh's window and survives it
+    assert refresher.snapshot.times("2030-01-02") == ["11:00"]
+    assert refresher.snapshot.times("2030-01-03") == ["10:00"]
+    pool.shutdown()
+
+
+def test_incomplete_first_refresh_is_not_served():
+    def load(days_ahead, fresh=False):
+        snapshot = AvailabilitySnapshot.from_slots(slots("2030-01-02T08:00:00Z"), START, END)
+        snapshot.complete = False
+        return snapshot
+
+    refresher = AvailabilityRefresher(load, interval=60, days_ahead=7)
+    assert refresher.refresh() is False
+    assert refresher.snapshot is None
+    assert refresher.last_error == "incomplete availability fetch"
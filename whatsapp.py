@@ -0,0 +1,58 @@
+import os
+
+import locales
+import message_templates as templates
+from whatsapp_sender import WhatsAppSender
+
+# --- Settings ---
+META_API_URL = os.environ.get("META_API_URL")
+META_ACCESS_TOKEN = os.environ.get("META_ACCESS_TOKEN")
+
+# WhatsApp list messages accept at most 10 rows
+MAX_LIST_ROWS = 10
+
+
+sender = WhatsAppSender(META_ACCESS_TOKEN)
+
+
+def send_whatsapp_payload(phone_number, payload):
+    # Queued for the rate-limited sender; False means the queue stayed full.
+    # payload is a dict or a body already rendered from message_templates.
+    return sender.send(META_API_URL, phone_number, payload)
+
+
+def send_whatsapp_message(phone_number, message):
+    return send_whatsapp_payload(phone_number, templates.TEXT.render(to=phone_number, body=message))
+
+
+def send_main_menu(phone_number):
+    return send_whatsapp_payload(phone_number, templates.MAIN_MENU.render(to=phone_number))
+
+
+def send_service_list(phone_number):
+    return send_whatsapp_payload(phone_number, templates.SERVICE_LIST.render(to=phone_number))
+
+
+def send_date_slots(phone_number, dates):
+    # The row id is the date itself so the reply carries it back
+    rows = templates.DATE_ROWS.render(
+        (d["title"], d["title"], d["description"]) for d in dates[:MAX_LIST_ROWS]
+    )
+    return send_whatsapp_payload(phone_number, templates.DATE_SLOTS.render(to=phone_number, rows=rows))
+
+
+def send_time_slots(phone_number, date, times, locale=locales.DEFAULT_LOCALE):
+    label = locales.date_label(date, locale)
+    rows = templates.TIME_ROWS.render((t["title"], t["title"], label) for t in times[:MAX_LIST_ROWS])
+    return send_whatsapp_payload(phone_number, templates.TIME_SLOTS.render(to=phone_number, rows=rows))
+
+
+def send_confirmation(phone_number, user):
+    msg = (
+        f"تم تأكيد الحجز ✅\n\n"
+        f"الاسم: {user.name}\n"
+        f"الخدمة: {user.service}\n"
+        f"التاريخ: {user.date}\n"
+        f"الوقت: {user.time}\n"
+    )
+    return send_whatsapp_message(phone_number, msg)
@@ -0,0 +1,181 @@
+import os
+import queue
+import random
+import threading
+import time
+import zlib
+from collections import deque
+from urllib.parse import urlparse
+
+import http_client
+
+# --- Settings ---
+META_SEND_RATE = float(os.environ.get("META_SEND_RATE", 20))
+META_SEND_BURST = int(os.environ.get("META_SEND_BURST", 40))
+META_SEND_WORKERS = int(os.environ.get("META_SEND_WORKERS", 4))
+META_SEND_QUEUE_SIZE = int(os.environ.get("META_SEND_QUEUE_SIZE", 500))
+META_SEND_MAX_ATTEMPTS = int(os.environ.get("META_SEND_MAX_ATTEMPTS", 5))
+META_SEND_ENQUEUE_TIMEOUT = float(os.environ.get("META_SEND_ENQUEUE_TIMEOUT", 5))
+
+
+class TokenBucket:
+    """Allows ``rate`` sends per second on average with bursts up to ``burst``."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def block_for(self, seconds):
+        # After a 429 nobody sends from this number until the window passes
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+def sending_number(url):
+    # https://graph.facebook.com/v17.0/<phone_number_id>/messages
+    parts = urlparse(url).path.strip("/").split("/")
+    return parts[-2] if len(parts) >= 2 else url
+
+
+class WhatsAppSender:
+    """Bounded queue of outbound Meta messages sent by a pool of workers.
+
+    Messages are sharded by recipient like work_queue.MessageQueue, so one
+    worker sends everything for a customer in the order it was queued, retries
+    included, while different customers are sent in parallel.
+
+    Each sending number has its own token bucket. 429 responses pause that
+    number for Retry-After seconds and 5xx responses are retried with backoff,
+    both up to META_SEND_MAX_ATTEMPTS. send() blocks for at most
+    META_SEND_ENQUEUE_TIMEOUT when the queue is full and then gives up, so
+    callers feel the backpressure instead of the queue growing without bound.
+    """
+
+    def __init__(self, access_token, workers=META_SEND_WORKERS, maxsize=META_SEND_QUEUE_SIZE,
+                 rate=META_SEND_RATE, burst=META_SEND_BURST, max_attempts=META_SEND_MAX_ATTEMPTS):
+        self.access_token = access_token
+        self.workers = workers
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self._queues = [queue.Queue(max(1, maxsize // workers)) for _ in range(workers)]
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._threads = []
+        self._latencies = deque(maxlen=1000)
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._threads:
+            return
+        for i, q in enumerate(self._queues):
+            thread = threading.Thread(target=self._run, args=(q,), name=f"meta-sender-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def send(self, url, to, body, timeout=META_SEND_ENQUEUE_TIMEOUT):
+        """Queue a JSON-serialisable payload (or pre-encoded bytes) for recipient ``to`` at ``url``."""
+        q = self._queues[zlib.crc32(to.encode()) % len(self._queues)]
+        try:
+            q.put((url, body, time.monotonic()), timeout=timeout)
+            return True
+        except queue.Full:
+            self.rejected += 1
+            print("❌ Meta send queue full, dropping message")
+            return False
+
+    def join(self):
+        for q in self._queues:
+            q.join()
+
+    def bucket(self, url):
+        number = sending_number(url)
+        with self._buckets_lock:
+            bucket = self._buckets.get(number)
+            if bucket is None:
+                bucket = self._buckets[number] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def stats(self):
+        latencies = sorted(self._latencies)
+        return {
+            "queue_depth": sum(q.qsize() for q in self._queues),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "rejected": self.rejected,
+            "latency_p50_seconds": latencies[len(latencies) // 2] if latencies else None,
+            "latency_p95_seconds": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        }
+
+    def _post(self, url, body):
+        headers = {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json"
+        }
+        if isinstance(body, (bytes, str)):
+            return http_client.post(url, upstream="meta", headers=headers, data=body)
+        return http_client.post(url, upstream="meta", headers=headers, json=body)
+
+    def deliver(self, url, body):
+        bucket = self.bucket(url)
+        for attempt in range(1, self.max_attempts + 1):
+            bucket.acquire()
+            try:
+                response = self._post(url, body)
+            except Exception as e:
+                status_code, text, retry_after = None, str(e), None
+            else:
+                if response.ok:
+                    return True
+                status_code, text = response.status_code, response.text
+                retry_after = response.headers.get("Retry-After")
+
+            retryable = status_code is None or status_code == 429 or status_code >= 500
+            if not retryable or attempt == self.max_attempts:
+                print("❌ Meta API error:", status_code, text)
+                return False
+
+            self.retried += 1
+            delay = min(2 ** attempt, 30) * random.uniform(0.5, 1.0)
+            if status_code == 429:
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    pass
+                bucket.block_for(delay)
+            else:
+                time.sleep(delay)
+        return False
+
+    def _run(self, q):
+        while True:
+            url, body, enqueued_at = q.get()
+            try:
+                if self.deliver(url, body):
+                    self.sent += 1
+                    self._latencies.append(time.monotonic() - enqueued_at)
+                else:
+                    self.failed += 1
+            finally:
+                q.task_done()
@@ -0,0 +1,70 @@
+import os
+import queue
+import threading
+import zlib
+
+# --- Settings ---
+WEBHOOK_WORKERS = int(os.environ.get("WEBHOOK_WORKERS", 4))
+WEBHOOK_QUEUE_SIZE = int(os.environ.get("WEBHOOK_QUEUE_SIZE", 1000))
+
+
+class MessageQueue:
+    """Bounded in-process work queue drained by a pool of worker threads.
+
+    Items are sharded by key (the sender's phone number), so messages from one
+    user are handled in arrival order by the same worker while different users
+    are processed in parallel.
+    """
+
+    def __init__(self, handler, workers=WEBHOOK_WORKERS, maxsize=WEBHOOK_QUEUE_SIZE):
+        self.handler = handler
+        self._queues = [queue.Queue(max(1, maxsize // workers)) for _ in range(workers)]
+        self._threads = []
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._threads:
+            return
+        for i, q in enumerate(self._queues):
+            thread = threading.Thread(target=self._run, args=(q,), name=f"webhook-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, key, item):
+        # Never blocks the request thread; a full shard is reported to the caller
+        q = self._queues[zlib.crc32(key.encode()) % len(self._queues)]
+        try:
+            q.put_nowait(item)
+            return True
+        except queue.Full:
+            self.rejected += 1
+            return False
+
+    def join(self):
+        for q in self._queues:
+            q.join()
+
+    def depth(self):
+        return sum(q.qsize() for q in self._queues)
+
+    def stats(self):
+        return {
+            "depth": self.depth(),
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def _run(self, q):
+        while True:
+            item = q.get()
+            try:
+                self.handler(item)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                print("Webhook error:", str(e))
+            finally:
+                q.task_done()